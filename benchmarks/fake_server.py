@@ -0,0 +1,279 @@
+import itertools
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Power BI push datasets accept at most this many rows per POST.
+MAX_ROWS_PER_REQUEST = 10000
+
+_TOKEN = re.compile(r'^/(?P<tenant>[^/]+)/oauth2/token$')
+_DATASETS = re.compile(r'^/(?P<version>[^/]+)/myorg/groups/(?P<group>[^/]+)/datasets$')
+_TABLES = re.compile(r'^/(?P<version>[^/]+)/myorg/groups/(?P<group>[^/]+)/tables$')
+_ROWS = re.compile(r'^/(?P<version>[^/]+)/myorg/groups/(?P<group>[^/]+)/tables/(?P<table>[^/]+)/rows$')
+_PIPELINE = re.compile(
+    r'^/subscriptions/(?P<subscription>[^/]+)/resourceGroups/(?P<group>[^/]+)'
+    r'/providers/Microsoft\.DataFactory/factories/(?P<factory>[^/]+)/pipelines/(?P<name>[^/?]+)$'
+)
+
+
+class FakePowerBIServer:
+    """
+    A local stand-in for the Azure AD token endpoint, the Power BI push dataset endpoints used by PowerBIDataSource,
+    and the ARM pipeline PUT used by PowerAutomateScheduler.
+
+    Every endpoint is served from the same host, so clients are pointed at it through their api_url, authority_url
+    and management_url arguments. Groups and their datasets are created on first use.
+
+    As in the Power BI push API, DELETE on a table's rows removes every row. The deleteDetails filter sent by
+    PowerBIDataSource is ignored, as is the updateDetails of a PATCH, which is accepted without changing any rows.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, throttle_every=0, retry_after=0.05,
+                 max_rows_per_request=MAX_ROWS_PER_REQUEST):
+        """
+        Constructor for the FakePowerBIServer class.
+
+        Parameters:
+            host (str): The interface to listen on (default is '127.0.0.1').
+            port (int): The port to listen on; 0 picks a free port (default is 0).
+            latency (float): Seconds of delay added to every response (default is 0.0).
+            throttle_every (int): Respond 429 to every Nth Power BI API request; 0 disables throttling (default is 0).
+                Token and ARM requests are never throttled.
+            retry_after (float): The Retry-After value sent with 429 responses, in seconds (default is 0.05).
+            max_rows_per_request (int): Row posts larger than this are rejected with 400 (default is 10000).
+        """
+        self.latency = latency
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.max_rows_per_request = max_rows_per_request
+        self.lock = threading.Lock()
+        self.tables = {}
+        self.pipelines = {}
+        self.request_count = 0
+        self.throttled_count = 0
+        self._throttle_candidates = 0
+        self._ids = itertools.count(1)
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        """
+        Starts serving on a background thread.
+
+        Returns:
+            FakePowerBIServer: The server, for chaining.
+        """
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stops serving and closes the listening socket.
+        """
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def row_count(self, group_id, table_name):
+        """
+        Returns the number of rows currently stored in a table.
+        """
+        with self.lock:
+            table = next((t for t in self.tables.get(group_id, {}).values() if t['name'] == table_name), None)
+            return 0 if table is None else len(table['rows'])
+
+    def reset_tables(self):
+        """
+        Removes every table and its rows.
+        """
+        with self.lock:
+            self.tables.clear()
+
+    def add_table(self, group_id, table_name, columns=None):
+        """
+        Creates a table directly, without going through the API.
+
+        Returns:
+            str: The ID of the new table.
+        """
+        with self.lock:
+            table_id = f'table-{next(self._ids)}'
+            self.tables.setdefault(group_id, {})[table_id] = {
+                'id': table_id, 'name': table_name, 'columns': columns or [], 'rows': [],
+            }
+            return table_id
+
+    def _should_throttle(self, throttled):
+        with self.lock:
+            self.request_count += 1
+            if not throttled:
+                return False
+            self._throttle_candidates += 1
+            if self.throttle_every and self._throttle_candidates % self.throttle_every == 0:
+                self.throttled_count += 1
+                return True
+            return False
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, payload=None, headers=None):
+                body = b'' if payload is None else json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _error(self, status, message):
+                self._send(status, {'error': {'code': str(status), 'message': message}})
+
+            def _body(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                return self.rfile.read(length) if length else b''
+
+            def _handle(self, method):
+                body = self._body()
+                if server.latency:
+                    time.sleep(server.latency)
+                path = self.path.split('?', 1)[0]
+                for pattern, handler, throttled in ROUTES.get(method, ()):
+                    match = pattern.match(path)
+                    if match:
+                        if server._should_throttle(throttled):
+                            self._error_throttled()
+                            return
+                        handler(self, match, body)
+                        return
+                self._error(404, f'No route for {method} {path}')
+
+            def _error_throttled(self):
+                self._send(429, {'error': {'code': 'TooManyRequests', 'message': 'Rate limit exceeded.'}},
+                           headers={'Retry-After': str(server.retry_after)})
+
+            def _json(self, body):
+                try:
+                    return json.loads(body or b'{}')
+                except ValueError:
+                    return None
+
+            def token(self, match, body):
+                self._send(200, {
+                    'token_type': 'Bearer',
+                    'expires_in': 3600,
+                    'access_token': f'fake-token-{next(server._ids)}',
+                })
+
+            def list_datasets(self, match, body):
+                # PowerBIDataSource.create_table looks the group ID up among its datasets.
+                self._send(200, {'value': [{'id': match['group'], 'name': match['group']}]})
+
+            def list_tables(self, match, body):
+                with server.lock:
+                    tables = [{'id': t['id'], 'name': t['name']} for t in server.tables.get(match['group'], {}).values()]
+                self._send(200, {'value': tables})
+
+            def create_table(self, match, body):
+                data = self._json(body)
+                if not data or 'name' not in data:
+                    self._error(400, 'Table definition must include a name.')
+                    return
+                table_id = server.add_table(match['group'], data['name'], data.get('columns'))
+                self._send(201, {'id': table_id, 'name': data['name']})
+
+            def _table(self, match):
+                return server.tables.get(match['group'], {}).get(match['table'])
+
+            def post_rows(self, match, body):
+                data = self._json(body)
+                if data is None or not isinstance(data.get('rows'), list):
+                    self._error(400, 'Request body must include a rows list.')
+                    return
+                if len(data['rows']) > server.max_rows_per_request:
+                    self._error(400, f"Too many rows: {len(data['rows'])} exceeds {server.max_rows_per_request}.")
+                    return
+                with server.lock:
+                    table = self._table(match)
+                    if table is not None:
+                        table['rows'].extend(data['rows'])
+                if table is None:
+                    self._error(404, f"Table {match['table']} not found.")
+                    return
+                self._send(200, {})
+
+            def delete_rows(self, match, body):
+                with server.lock:
+                    table = self._table(match)
+                    if table is not None:
+                        table['rows'].clear()
+                if table is None:
+                    self._error(404, f"Table {match['table']} not found.")
+                    return
+                self._send(200, {})
+
+            def update_rows(self, match, body):
+                with server.lock:
+                    table = self._table(match)
+                if table is None:
+                    self._error(404, f"Table {match['table']} not found.")
+                    return
+                self._send(200, {})
+
+            def put_pipeline(self, match, body):
+                data = self._json(body)
+                if data is None:
+                    self._error(400, 'Request body must be JSON.')
+                    return
+                with server.lock:
+                    server.pipelines[match['name']] = data
+                self._send(201, {'name': match['name'], **data})
+
+            def do_GET(self):
+                self._handle('GET')
+
+            def do_POST(self):
+                self._handle('POST')
+
+            def do_PUT(self):
+                self._handle('PUT')
+
+            def do_PATCH(self):
+                self._handle('PATCH')
+
+            def do_DELETE(self):
+                self._handle('DELETE')
+
+        # Method -> (path pattern, handler, whether the route is subject to throttling).
+        ROUTES = {
+            'GET': [(_DATASETS, Handler.list_datasets, True), (_TABLES, Handler.list_tables, True)],
+            'POST': [(_TOKEN, Handler.token, False), (_TABLES, Handler.create_table, True), (_ROWS, Handler.post_rows, True)],
+            'PATCH': [(_ROWS, Handler.update_rows, True)],
+            'DELETE': [(_ROWS, Handler.delete_rows, True)],
+            'PUT': [(_PIPELINE, Handler.put_pipeline, False)],
+        }
+        return Handler
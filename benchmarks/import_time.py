@@ -0,0 +1,119 @@
+"""
+Import-time benchmark for the classDefinitions package and each of its clients.
+
+Run from the repository root:
+
+    python -m benchmarks.import_time --label my-change --compare benchmarks/results/import-baseline.json
+
+Each target is imported in a fresh interpreter, --repeat times, and the median and minimum wall time of the import are
+reported together with the heavy third-party packages it pulled in. Results are written to
+benchmarks/results/<label>.json.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+from benchmarks.run_benchmarks import RESULTS_DIR, git_commit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Target name -> statement whose import cost is measured.
+TARGETS = {
+    'package': 'import classDefinitions',
+    'PowerBIDataSource': 'from classDefinitions import PowerBIDataSource',
+    'MSSQLDatabase': 'from classDefinitions import MSSQLDatabase',
+    'PowerAutomateScheduler': 'from classDefinitions import PowerAutomateScheduler',
+    'FanOutRunner': 'from classDefinitions import FanOutRunner',
+}
+
+# Third-party packages whose presence in sys.modules after an import is reported.
+HEAVY_MODULES = ('requests', 'sqlalchemy', 'dask', 'pandas', 'urllib3')
+
+_PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+'''
+
+
+def measure(statement, repeat):
+    """
+    Imports a statement in repeat fresh interpreters.
+
+    Returns:
+        dict: The median and minimum import time in milliseconds and the heavy modules loaded.
+    """
+    samples, loaded = [], []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, '-c', _PROBE.format(statement=statement, heavy=HEAVY_MODULES)],
+            capture_output=True, text=True, check=True, cwd=ROOT,
+        ).stdout
+        probe = json.loads(out)
+        samples.append(probe['seconds'] * 1000)
+        loaded = probe['loaded']
+    return {
+        'median_ms': statistics.median(samples),
+        'min_ms': min(samples),
+        'repeat': repeat,
+        'heavy_modules_loaded': loaded,
+    }
+
+
+def format_report(report, baseline=None):
+    """
+    Formats a report as a text table, with the change in median import time from a baseline report when given.
+    """
+    lines = [f"Import time {report['label']} (commit {report['git_commit'] or 'unknown'}, Python {report['python']})"]
+    base = (baseline or {}).get('results', {})
+    for name, result in report['results'].items():
+        line = f"  {name:<24}{result['median_ms']:>9.1f} ms median{result['min_ms']:>9.1f} ms min"
+        old = base.get(name, {}).get('median_ms')
+        if old:
+            line += f"  {(result['median_ms'] - old) / old * 100:+.1f}% vs {baseline['label']}"
+        if result['heavy_modules_loaded']:
+            line += f"  loads {', '.join(result['heavy_modules_loaded'])}"
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--label', default=datetime.now().strftime('import-%Y%m%d-%H%M%S'), help='name of the results file')
+    parser.add_argument('--targets', nargs='+', choices=list(TARGETS), default=list(TARGETS))
+    parser.add_argument('--repeat', type=int, default=10, help='fresh interpreters per target')
+    parser.add_argument('--output-dir', default=RESULTS_DIR, help='directory the results file is written to')
+    parser.add_argument('--compare', help='results file of an earlier run to compare against')
+    args = parser.parse_args(argv)
+
+    report = {
+        'label': args.label,
+        'created': datetime.now(timezone.utc).isoformat(),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': {name: measure(TARGETS[name], args.repeat) for name in args.targets},
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print(format_report(report, baseline))
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    path = os.path.join(args.output_dir, f'{args.label}.json')
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Results written to {path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,352 @@
+"""
+Throughput benchmarks for PowerBIDataSource, MSSQLDatabase and PowerAutomateScheduler.
+
+Run from the repository root:
+
+    python -m benchmarks.run_benchmarks --label my-change --compare benchmarks/results/baseline.json
+
+Each scenario runs in its own process against a local FakePowerBIServer or a SQLite database and reports
+rows/sec, requests per row, p50/p99 call latency and peak RSS. Results are written to
+benchmarks/results/<label>.json.
+"""
+import argparse
+import importlib
+import json
+import math
+import multiprocessing
+import os
+import platform
+import queue as queue_module
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from benchmarks.fake_server import FakePowerBIServer
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+GROUP_ID = 'bench-group'
+TABLE_NAME = 'bench_rows'
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+# Metrics compared by --compare, and whether a higher value is better.
+COMPARED = {
+    'rows_per_sec': True,
+    'requests_per_row': False,
+    'p50_ms': False,
+    'p99_ms': False,
+    'peak_rss_mb': False,
+}
+
+
+def make_rows(start, count):
+    return [
+        {'id': i, 'name': f'row-{i}', 'value': i * 0.5, 'updated': '2022-02-20T00:00:00Z'}
+        for i in range(start, start + count)
+    ]
+
+
+def percentile(values, pct):
+    """
+    Returns the nearest-rank percentile of a list of values, or None if it is empty.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def peak_rss_mb():
+    """
+    Returns the peak resident set size of the current process in MiB, or None where unavailable.
+    """
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return rss / divisor
+
+
+def _timed_calls(calls):
+    durations = []
+    start = time.perf_counter()
+    for call in calls:
+        call_start = time.perf_counter()
+        call()
+        durations.append(time.perf_counter() - call_start)
+    return durations, time.perf_counter() - start
+
+
+def run_powerbi_append(config, server_url):
+    from classDefinitions.dataSource import PowerBIDataSource
+
+    client = PowerBIDataSource('bench-client', 'bench-secret', 'bench-tenant', api_url=server_url, authority_url=server_url,
+                               max_retries=config['max_retries'])
+    batch_size = config['batch_size']
+    calls = [
+        (lambda start=start: client.append_rows(GROUP_ID, TABLE_NAME, make_rows(start, min(batch_size, config['rows'] - start))))
+        for start in range(0, config['rows'], batch_size)
+    ]
+    durations, elapsed = _timed_calls(calls)
+    return {'rows': config['rows'], 'durations': durations, 'elapsed': elapsed}
+
+
+def _sqlite_database(config):
+    from classDefinitions.SQLAlchemy.sqlAlchemy import MSSQLDatabase
+
+    db = MSSQLDatabase(f"sqlite:///{config['sqlite_path']}", 'bench', 'main', TABLE_NAME)
+    db.create_table([
+        {'name': 'id', 'type': 'Integer'},
+        {'name': 'name', 'type': 'String'},
+        {'name': 'value', 'type': 'String'},
+        {'name': 'updated', 'type': 'String'},
+    ])
+    return db
+
+
+def run_mssql_append(config, server_url):
+    db = _sqlite_database(config)
+    batch_size = config['batch_size']
+    calls = [
+        (lambda start=start: db.append_table(make_rows(start, min(batch_size, config['rows'] - start))))
+        for start in range(0, config['rows'], batch_size)
+    ]
+    durations, elapsed = _timed_calls(calls)
+    return {'rows': config['rows'], 'durations': durations, 'elapsed': elapsed}
+
+
+def run_mssql_select(config, server_url):
+    db = _sqlite_database(config)
+    db.append_table(make_rows(0, config['rows']))
+    returned = []
+    calls = [
+        (lambda: returned.append(len(db.select_table(['id', 'name', 'value', 'updated']))))
+        for _ in range(config['select_iterations'])
+    ]
+    durations, elapsed = _timed_calls(calls)
+    return {'rows': sum(returned), 'durations': durations, 'elapsed': elapsed}
+
+
+def run_schedule(config, server_url):
+    from classDefinitions.PowerAutomate.powerAutoAPI import PowerAutomateScheduler
+
+    scheduler = PowerAutomateScheduler(
+        'bench-client', 'bench-secret', 'bench-tenant', 'bench-subscription', 'bench-resource-group', 'bench-factory',
+        authority_url=server_url, management_url=server_url,
+    )
+    calls = [
+        (lambda i=i: scheduler.schedule(
+            dataset_id=GROUP_ID,
+            table_name=TABLE_NAME,
+            schedule_name=f'bench-schedule-{i}',
+            recurrence_pattern='0 * * * *',
+            recurrence_interval=1,
+            recurrence_frequency='Hour',
+            timezone='UTC',
+            startTime='2022-02-22T01:00:00Z',
+        ))
+        for i in range(config['schedules'])
+    ]
+    durations, elapsed = _timed_calls(calls)
+    return {'rows': config['schedules'], 'durations': durations, 'elapsed': elapsed}
+
+
+# Scenario name -> (function, whether it talks to the fake server, third-party modules it depends on).
+SCENARIOS = {
+    'powerbi_append': (run_powerbi_append, True, ['requests']),
+    'mssql_append': (run_mssql_append, False, ['sqlalchemy']),
+    'mssql_select': (run_mssql_select, False, ['sqlalchemy']),
+    'schedule': (run_schedule, True, ['requests']),
+}
+
+
+def _worker(name, config, server_url, queue):
+    try:
+        function, _, dependencies = SCENARIOS[name]
+        # The clients import their dependencies on first use; import them here so that cost, which
+        # benchmarks/import_time.py measures, stays out of the timed calls
+        for module in dependencies:
+            importlib.import_module(module)
+
+        raw = function(config, server_url)
+        raw['peak_rss_mb'] = peak_rss_mb()
+        queue.put(('ok', raw))
+    except Exception as e:
+        queue.put(('error', f'{type(e).__name__}: {e}'))
+
+
+def _wait_for_result(name, process, queue, poll_interval=1.0):
+    """
+    Waits for a scenario process to post its result.
+
+    Raises:
+        RuntimeError: If the process exits without posting a result, e.g. after being killed.
+    """
+    while True:
+        try:
+            return queue.get(timeout=poll_interval)
+        except queue_module.Empty:
+            if not process.is_alive():
+                # The result may have arrived between the timeout and the liveness check
+                try:
+                    return queue.get(timeout=poll_interval)
+                except queue_module.Empty:
+                    raise RuntimeError(
+                        f'Scenario {name} exited with code {process.exitcode} without reporting a result.'
+                    ) from None
+
+
+def run_scenario(name, config, server):
+    """
+    Runs one scenario in a fresh process so that peak RSS reflects that scenario alone.
+
+    Returns:
+        dict: The scenario summary.
+    """
+    uses_server, server_url = SCENARIOS[name][1], server.url
+    if uses_server:
+        server.reset_tables()
+        server.add_table(GROUP_ID, TABLE_NAME)
+    requests_before, throttled_before = server.request_count, server.throttled_count
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scenario_config = dict(config, sqlite_path=os.path.join(tmp, 'bench.db'))
+        context = multiprocessing.get_context('spawn')
+        queue = context.Queue()
+        process = context.Process(target=_worker, args=(name, scenario_config, server_url, queue))
+        process.start()
+        status, raw = _wait_for_result(name, process, queue)
+        process.join()
+    if status != 'ok':
+        raise RuntimeError(f'Scenario {name} failed: {raw}')
+
+    rows, durations = raw['rows'], raw['durations']
+    requests_sent = server.request_count - requests_before if uses_server else None
+    return {
+        'rows': rows,
+        'calls': len(durations),
+        'elapsed_s': raw['elapsed'],
+        'rows_per_sec': rows / raw['elapsed'] if raw['elapsed'] else None,
+        'requests': requests_sent,
+        'requests_per_row': requests_sent / rows if requests_sent is not None and rows else None,
+        'throttled': server.throttled_count - throttled_before if uses_server else None,
+        'p50_ms': percentile(durations, 50) * 1000 if durations else None,
+        'p99_ms': percentile(durations, 99) * 1000 if durations else None,
+        'peak_rss_mb': raw['peak_rss_mb'],
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(config, scenarios):
+    """
+    Runs the given scenarios against a fresh fake server.
+
+    Returns:
+        dict: The benchmark report, including environment details and one summary per scenario.
+    """
+    server = FakePowerBIServer(
+        latency=config['latency'],
+        throttle_every=config['throttle_every'],
+        retry_after=config['retry_after'],
+        max_rows_per_request=config['max_rows_per_request'],
+    )
+    with server:
+        results = {name: run_scenario(name, config, server) for name in scenarios}
+    return {
+        'label': config['label'],
+        'created': datetime.now(timezone.utc).isoformat(),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': config,
+        'results': results,
+    }
+
+
+def _format(value):
+    if value is None:
+        return '-'
+    return f'{value:.4g}' if isinstance(value, float) else str(value)
+
+
+def format_report(report, baseline=None):
+    """
+    Formats a report as a text table, with the change from a baseline report when given.
+    """
+    lines = [f"Benchmark {report['label']} (commit {report['git_commit'] or 'unknown'}, Python {report['python']})"]
+    for name, result in report['results'].items():
+        lines.append(f'  {name}')
+        base = (baseline or {}).get('results', {}).get(name, {})
+        for metric in ['rows', 'requests', 'throttled'] + list(COMPARED):
+            line = f'    {metric:<18}{_format(result.get(metric)):>12}'
+            old, new = base.get(metric), result.get(metric)
+            if metric in COMPARED and old and new is not None:
+                change = (new - old) / old * 100
+                better = (change > 0) == COMPARED[metric]
+                line += f'  {change:+.1f}% vs {baseline["label"]}' + ('' if abs(change) < 0.05 else (' (better)' if better else ' (worse)'))
+            lines.append(line)
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--label', default=datetime.now().strftime('%Y%m%d-%H%M%S'), help='name of the results file')
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--rows', type=int, default=20000, help='rows appended or selected per scenario')
+    parser.add_argument('--batch-size', type=int, default=1000, help='rows per append call')
+    parser.add_argument('--select-iterations', type=int, default=20, help='select_table calls in mssql_select')
+    parser.add_argument('--schedules', type=int, default=200, help='schedule calls in the schedule scenario')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds of simulated latency per request')
+    parser.add_argument('--throttle-every', type=int, default=0, help='respond 429 to every Nth request (0 disables)')
+    parser.add_argument('--retry-after', type=float, default=0.05, help='Retry-After seconds sent with 429 responses')
+    parser.add_argument('--max-retries', type=int, default=3, help='times powerbi_append retries a 429 response')
+    parser.add_argument('--max-rows-per-request', type=int, default=10000, help='row limit enforced by the fake server')
+    parser.add_argument('--output-dir', default=RESULTS_DIR, help='directory the results file is written to')
+    parser.add_argument('--compare', help='results file of an earlier run to compare against')
+    args = parser.parse_args(argv)
+
+    config = {
+        'label': args.label,
+        'rows': args.rows,
+        'batch_size': args.batch_size,
+        'select_iterations': args.select_iterations,
+        'schedules': args.schedules,
+        'latency': args.latency,
+        'throttle_every': args.throttle_every,
+        'retry_after': args.retry_after,
+        'max_retries': args.max_retries,
+        'max_rows_per_request': args.max_rows_per_request,
+    }
+    report = run(config, args.scenarios)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print(format_report(report, baseline))
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    path = os.path.join(args.output_dir, f'{args.label}.json')
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Results written to {path}')
+
+
+if __name__ == '__main__':
+    main()
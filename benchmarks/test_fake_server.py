@@ -0,0 +1,89 @@
+import os
+import unittest
+from benchmarks.fake_server import FakePowerBIServer
+from benchmarks.run_benchmarks import format_report, percentile
+from classDefinitions.dataSource import PowerBIDataSource
+from classDefinitions.PowerAutomate.powerAutoAPI import PowerAutomateScheduler
+
+
+class TestFakePowerBIServer(unittest.TestCase):
+    def setUp(self):
+        self.server = FakePowerBIServer(throttle_every=3, retry_after=0, max_rows_per_request=10).start()
+        self.addCleanup(self.server.stop)
+        self.server.add_table('test_group', 'test_table_name')
+        self.data_source = PowerBIDataSource(
+            'test_client_id', 'test_client_secret', 'test_tenant_id',
+            api_url=self.server.url, authority_url=self.server.url, max_retries=3
+        )
+
+    def test_append_rows_with_throttling(self):
+        for _ in range(3):
+            self.data_source.append_rows('test_group', 'test_table_name', [{'a': i} for i in range(10)])
+
+        self.assertEqual(self.server.row_count('test_group', 'test_table_name'), 30)
+        self.assertEqual(self.server.throttled_count, 2)
+        self.assertEqual(self.server.request_count, 11)
+
+    def test_row_limit(self):
+        with self.assertRaises(ValueError):
+            self.data_source.append_rows('test_group', 'test_table_name', [{'a': i} for i in range(11)])
+
+    def test_delete_clears_rows(self):
+        self.server.throttle_every = 0
+        self.data_source.append_rows('test_group', 'test_table_name', [{'a': i} for i in range(5)])
+
+        outcomes = self.data_source.delete_rows_by_keys('test_group', 'test_table_name', 'a', [1, 2])
+
+        self.assertEqual([o['status'] for o in outcomes], ['ok'])
+        self.assertEqual(self.server.row_count('test_group', 'test_table_name'), 0)
+
+    def test_update_keeps_rows(self):
+        self.server.throttle_every = 0
+        self.data_source.append_rows('test_group', 'test_table_name', [{'a': i} for i in range(5)])
+
+        outcomes = self.data_source.update_rows_by_keys('test_group', 'test_table_name', 'a', {1: {'b': 1}})
+
+        self.assertEqual([o['status'] for o in outcomes], ['ok'])
+        self.assertEqual(self.server.row_count('test_group', 'test_table_name'), 5)
+
+    def test_schedule(self):
+        scheduler = PowerAutomateScheduler(
+            'test_client_id', 'test_client_secret', 'test_tenant_id', 'test_subscription_id',
+            'test_resource_group', 'test_factory_name',
+            authority_url=self.server.url, management_url=self.server.url
+        )
+
+        scheduler.schedule(dataset_id='test_group', table_name='test_table_name', schedule_name='test_schedule_name')
+
+        self.assertIn('test_schedule_name', self.server.pipelines)
+
+
+class TestReport(unittest.TestCase):
+    def test_percentile(self):
+        self.assertEqual(percentile(list(range(1, 101)), 50), 50)
+        self.assertEqual(percentile(list(range(1, 101)), 99), 99)
+        self.assertIsNone(percentile([], 50))
+
+    def test_format_report_compares_with_baseline(self):
+        baseline = {'label': 'old', 'results': {'powerbi_append': {'rows_per_sec': 100.0}}}
+        report = {
+            'label': 'new', 'git_commit': 'abc123', 'python': '3.11',
+            'results': {'powerbi_append': {'rows': 10, 'rows_per_sec': 150.0}},
+        }
+
+        text = format_report(report, baseline)
+
+        self.assertIn('+50.0% vs old (better)', text)
+
+    def test_wait_for_result_raises_when_worker_dies(self):
+        import multiprocessing
+        from benchmarks.run_benchmarks import _wait_for_result
+
+        context = multiprocessing.get_context('spawn')
+        queue = context.Queue()
+        process = context.Process(target=os._exit, args=(3,))
+        process.start()
+
+        with self.assertRaisesRegex(RuntimeError, 'exited with code 3'):
+            _wait_for_result('test_scenario', process, queue, poll_interval=0.1)
+        process.join()
@@ -1,7 +1,11 @@
-import requests
+import time
+from classDefinitions.instrumentation import NULL_INSTRUMENTATION, instrumented
 
 class PowerAutomateScheduler:
-    def __init__(self, client_id, client_secret, tenant_id, subscription_id, resource_group, factory_name, api_version='2016-06-01'):
+    _metrics_client = 'powerautomate'
+
+    def __init__(self, client_id, client_secret, tenant_id, subscription_id, resource_group, factory_name, api_version='2016-06-01', instrumentation=None,
+                 authority_url='https://login.microsoftonline.com', management_url='https://management.azure.com'):
         """
         Initializes a new instance of the PowerAutomateScheduler class.
 
@@ -10,6 +14,9 @@ class PowerAutomateScheduler:
             client_secret (str): The client secret for your Azure AD application.
             tenant_id (str): The ID of your Azure AD tenant.
             api_version (str, optional): The version of the Power Automate API to use. Defaults to '2016-06-01'.
+            instrumentation (Instrumentation, optional): Records metrics and events for this client. Disabled if omitted.
+            authority_url (str, optional): The Azure AD authority to request tokens from. Defaults to 'https://login.microsoftonline.com'.
+            management_url (str, optional): The Azure Resource Manager endpoint. Defaults to 'https://management.azure.com'.
 
         Returns:
             None
@@ -22,8 +29,31 @@ class PowerAutomateScheduler:
         self.resource_group = resource_group
         self.factory_name = factory_name
         self.api_version = api_version
+        self.authority_url = authority_url.rstrip('/')
+        self.management_url = management_url.rstrip('/')
         self.token = None
         self.headers = {'Content-Type': 'application/json'}
+        self.instrumentation = instrumentation if instrumentation is not None else NULL_INSTRUMENTATION
+
+    def _request(self, method, url, operation, **kwargs):
+        """
+        Sends an HTTP request and records request metrics.
+
+        Parameters:
+            method (str): The HTTP method, e.g. 'post' or 'put'.
+            url (str): The URL to send the request to.
+            operation (str): The operation label recorded with the request metrics.
+            **kwargs: Passed to the requests function.
+
+        Returns:
+            requests.Response: The response.
+        """
+        import requests
+
+        start = time.perf_counter()
+        resp = getattr(requests, method)(url, **kwargs)
+        self.instrumentation.record_request(self._metrics_client, operation, resp, time.perf_counter() - start)
+        return resp
 
     def connect(self):
         """
@@ -36,8 +66,8 @@ class PowerAutomateScheduler:
             None
         """
         # Get an access token for the API
-        auth_url = f'https://login.microsoftonline.com/{self.tenant_id}/oauth2/token'
-        auth_resp = requests.post(auth_url, data={
+        auth_url = f'{self.authority_url}/{self.tenant_id}/oauth2/token'
+        auth_resp = self._request('post', auth_url, 'connect', data={
             'grant_type': 'client_credentials',
             'client_id': self.client_id,
             'client_secret': self.client_secret,
@@ -45,6 +75,7 @@ class PowerAutomateScheduler:
         })
         if auth_resp.status_code != 200:
             raise ValueError(f"Could not authenticate with Power Automate API. Error {auth_resp.status_code}: {auth_resp.text}")
+        self.instrumentation.inc('powerbiapi_auth_refreshes_total', client=self._metrics_client)
         self.token = auth_resp.json()['access_token']
         self.headers['Authorization'] = f'Bearer {self.token}'
 
@@ -88,7 +119,7 @@ class PowerAutomateScheduler:
             }
             try:
                 if isRefresh is True and script is None:
-                    schedule['pipeline']['activities'] = [
+                    schedule['properties']['pipeline']['activities'] = [
                                 {
                                     'name': 'RefreshData',
                                     'type': 'WebActivity',
@@ -108,7 +139,9 @@ class PowerAutomateScheduler:
                 print('If isRefresh is True, there must not be a script argument')
             try:
                 if script is not None and isRefresh is False:
-                    schedule['pipeline']['activities'] = [
+                    # Script pipelines are not bound to a Power BI table
+                    del schedule['properties']['dataSource']
+                    schedule['properties']['pipeline']['activities'] = [
                             {
                                 'name': 'RunPythonScript',
                                 'type': 'HDInsightHive',
@@ -126,6 +159,7 @@ class PowerAutomateScheduler:
 
             return schedule
 
+    @instrumented('schedule')
     def schedule(
         self,
         dataset_id=None,
@@ -157,20 +191,21 @@ class PowerAutomateScheduler:
         self.connect()
 
         # Define the schedule request body
-        schedule = self._build_schedule(
-            dataset_id,
-            table_name,
-            schedule_name,
-            recurrence_pattern,
-            timezone,
-            recurrence_interval,
-            recurrence_frequency,
-            startTime,
-            description
+        schedule = self._build_schedule_dict(
+            dataset_id=dataset_id,
+            table_name=table_name,
+            schedule_name=schedule_name,
+            recurrence_pattern=recurrence_pattern,
+            recurrence_interval=recurrence_interval,
+            recurrence_frequency=recurrence_frequency,
+            timezone=timezone,
+            startTime=startTime,
+            description=description,
+            isRefresh=True
             )
 
         # Submit the schedule request
-        create_pipeline_url = f'''https://management.azure.com/subscriptions/{
+        create_pipeline_url = f'''{self.management_url}/subscriptions/{
             self.subscription_id
             }/resourceGroups/{
                 self.resource_group
@@ -181,10 +216,11 @@ class PowerAutomateScheduler:
                         }?api-version={
                             self.api_version
                             }'''
-        create_pipeline_resp = requests.put(create_pipeline_url, headers=self.headers, json=schedule)
+        create_pipeline_resp = self._request('put', create_pipeline_url, 'schedule', headers=self.headers, json=schedule)
         if create_pipeline_resp.status_code != 201:
             raise ValueError(f"Could not create schedule in Power Automate. Error {create_pipeline_resp.status_code}: {create_pipeline_resp.text}")
 
+    @instrumented('schedule_script')
     def schedule_script(
         self,
         schedule_name=None,
@@ -213,25 +249,27 @@ class PowerAutomateScheduler:
         """
         self.connect()
 
-        schedule = self._build_schedule(
-            schedule_name,
-            recurrence_pattern,
-            timezone,
-            recurrence_interval,
-            recurrence_frequency,
-            startTime,
-            description,
-            script
+        schedule = self._build_schedule_dict(
+            schedule_name=schedule_name,
+            recurrence_pattern=recurrence_pattern,
+            recurrence_interval=recurrence_interval,
+            recurrence_frequency=recurrence_frequency,
+            timezone=timezone,
+            startTime=startTime,
+            description=description,
+            script=script
             )
 
         # Submit the schedule request
-        create_pipeline_url = f'''https://management.azure.com/subscriptions/{
+        create_pipeline_url = f'''{self.management_url}/subscriptions/{
             self.subscription_id
-            }/resourceGroups/myResourceGroup/providers/Microsoft.DataFactory/factories/{
+            }/resourceGroups/{
+                self.resource_group
+                }/providers/Microsoft.DataFactory/factories/{
                 self.factory_name
                 }/pipelines/{
                     schedule_name
                     }?api-version={self.api_version}'''
-        create_pipeline_resp = requests.put(create_pipeline_url, headers=self.headers, json=schedule)
+        create_pipeline_resp = self._request('put', create_pipeline_url, 'schedule_script', headers=self.headers, json=schedule)
         if create_pipeline_resp.status_code != 201:
             raise ValueError(f"Could not create schedule in Power Automate. Error {create_pipeline_resp.status_code}: {create_pipeline_resp.text}")
@@ -1,53 +1,86 @@
-from sqlalchemy import create_engine, Table, Column, Integer, String, MetaData
-from sqlalchemy.sql import select
-from sqlalchemy import text, select, Table, MetaData, case, func, over
+from classDefinitions.instrumentation import NULL_INSTRUMENTATION, instrumented
 
 class MSSQLDatabase:
-    def __init__(self, connection_string, database_name, schema_name, table_name):
+    _metrics_client = 'mssql'
+
+    def __init__(self, connection_string, database_name, schema_name, table_name, instrumentation=None):
+        try:
+            from sqlalchemy import create_engine
+        except ImportError as e:
+            raise ImportError("MSSQLDatabase requires SQLAlchemy 1.x. Install it with: pip install 'sqlalchemy<2'") from e
         self.engine = create_engine(connection_string)
         self.database_name = database_name
         self.schema_name = schema_name
         self.table_name = table_name
+        self.instrumentation = instrumentation if instrumentation is not None else NULL_INSTRUMENTATION
+
+    @property
+    def _full_name(self):
+        return f"{self.database_name}.{self.schema_name}.{self.table_name}"
+
+    def _reflect(self, meta, conn):
+        with self.instrumentation.timer('powerbiapi_reflection_duration_seconds', client=self._metrics_client):
+            meta.reflect(bind=conn, schema=self.schema_name, views=True)
 
+    @instrumented('create_table')
     def create_table(self, columns):
+        from sqlalchemy import Column, MetaData, Table, types
+
         meta = MetaData()
         table = Table(self.table_name, meta, schema=self.schema_name)
         for column in columns:
-            table.append_column(Column(column['name'], eval(column['type'])))
+            table.append_column(Column(column['name'], eval(column['type'], {}, vars(types))))
         table.create(self.engine)
-        print(f"Table {self.database_name}.{self.schema_name}.{self.table_name} created.")
+        self.instrumentation.event('table_created', f"Table {self._full_name} created.", table=self._full_name)
 
+    @instrumented('insert_dask_dataframe')
     def insert_dask_dataframe(self, df, if_exists='fail'):
+        from sqlalchemy import MetaData, Table
+
         meta = MetaData()
         with self.engine.connect() as conn:
-            meta.reflect(bind=conn, schema=self.schema_name, views=True)
+            self._reflect(meta, conn)
             table = Table(self.table_name, meta, schema=self.schema_name, autoload=True, autoload_with=conn)
             df.to_sql(name=self.table_name, con=conn, schema=self.schema_name, if_exists=if_exists, index=False)
 
+    @instrumented('append_table')
     def append_table(self, rows):
+        from sqlalchemy import MetaData, Table
+
         meta = MetaData()
         with self.engine.connect() as conn:
-            meta.reflect(bind=conn, schema=self.schema_name, views=True)
+            self._reflect(meta, conn)
             table = Table(self.table_name, meta, schema=self.schema_name, autoload=True, autoload_with=conn)
             for row in rows:
                 insert = table.insert().values(row)
                 conn.execute(insert)
-        print(f"{len(rows)} rows appended to table {self.database_name}.{self.schema_name}.{self.table_name}.")
+        self.instrumentation.observe('powerbiapi_rows_per_call', len(rows), client=self._metrics_client, operation='append_table')
+        self.instrumentation.event('rows_appended', f"{len(rows)} rows appended to table {self._full_name}.",
+                                   table=self._full_name, rows=len(rows))
 
+    @instrumented('update_table')
     def update_table(self, update_query):
+        from sqlalchemy import text
+
         with self.engine.connect() as conn:
             conn.execute(text(update_query))
-        print(f"Table {self.database_name}.{self.schema_name}.{self.table_name} updated.")
+        self.instrumentation.event('table_updated', f"Table {self._full_name} updated.", table=self._full_name)
 
+    @instrumented('delete_table')
     def delete_table(self, delete_query):
+        from sqlalchemy import text
+
         with self.engine.connect() as conn:
             conn.execute(text(delete_query))
-        print(f"Table {self.database_name}.{self.schema_name}.{self.table_name} deleted.")
+        self.instrumentation.event('table_deleted', f"Table {self._full_name} deleted.", table=self._full_name)
 
+    @instrumented('select_table')
     def select_table(self, select_cols, *args, ctes=None, **kwargs):
+        from sqlalchemy import MetaData, Table, case, func, over, select, text
+
         meta = MetaData()
         with self.engine.connect() as conn:
-            meta.reflect(bind=conn, schema=self.schema_name, views=True)
+            self._reflect(meta, conn)
             table = Table(self.table_name, meta, schema=self.schema_name, autoload=True, autoload_with=conn)
 
             if ctes is not None:
@@ -99,4 +132,5 @@ class MSSQLDatabase:
                     query = query.add_columns(getattr(func, func_name)(table.c[col]).over(window).label(col))
 
             result = conn.execute(query).fetchall()
+        self.instrumentation.observe('powerbiapi_rows_per_call', len(result), client=self._metrics_client, operation='select_table')
         return result
\ No newline at end of file
@@ -0,0 +1,38 @@
+"""
+Clients for the Power BI, Power Automate and SQL Server APIs.
+
+The clients are loaded on first attribute access, so ``import classDefinitions`` does not import requests or
+SQLAlchemy. Only the modules behind the names you use are imported:
+
+    from classDefinitions import PowerBIDataSource
+
+The client modules keep importing cheap in the same way: requests, SQLAlchemy and logging are imported inside the
+functions that use them, on first use, rather than at module level.
+"""
+import importlib
+
+# Public name -> module that defines it.
+_LAZY_ATTRIBUTES = {
+    'PowerBIDataSource': 'classDefinitions.dataSource',
+    'MSSQLDatabase': 'classDefinitions.SQLAlchemy.sqlAlchemy',
+    'PowerAutomateScheduler': 'classDefinitions.PowerAutomate.powerAutoAPI',
+    'FanOutRunner': 'classDefinitions.fanOut',
+    'Instrumentation': 'classDefinitions.instrumentation',
+    'MetricsRegistry': 'classDefinitions.instrumentation',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    # Cache on the package so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
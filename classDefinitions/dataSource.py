@@ -1,11 +1,21 @@
-import requests
+import time
+from classDefinitions.instrumentation import NULL_INSTRUMENTATION, instrumented
+
+# Default number of keys placed in a single delete/update filter.
+DEFAULT_KEYS_PER_REQUEST = 1000
+
 
 class PowerBIDataSource:
     """
     A class for creating and manipulating Power BI data sources using the Power BI API.
     """
 
-    def __init__(self, client_id, client_secret, tenant_id, api_version='v1.0'):
+    _metrics_client = 'powerbi'
+
+    def __init__(self, client_id, client_secret, tenant_id, api_version='v1.0', instrumentation=None, max_retries=0,
+                 max_retry_wait=60,
+                 api_url='https://api.powerbi.com', authority_url='https://login.microsoftonline.com',
+                 session=None, token_cache=None, rate_limiter=None):
         """
         Constructor for the PowerBIDataSource class.
 
@@ -14,29 +24,113 @@ class PowerBIDataSource:
             client_secret (str): The client secret for the Azure Active Directory application.
             tenant_id (str): The ID of the Azure Active Directory tenant.
             api_version (str): The version of the Power BI API to use (default is 'v1.0').
+            instrumentation (Instrumentation, optional): Records metrics and events for this client. Disabled if omitted.
+            max_retries (int): The number of times a rate-limited (429) request is retried after waiting. The default, 0,
+                returns the 429 response at once, so the call fails without waiting.
+            max_retry_wait (float): The longest Retry-After, in seconds, that is waited out before retrying. A 429 asking
+                for a longer wait is returned to the caller instead (default is 60).
+            api_url (str): The Power BI REST API endpoint (default is 'https://api.powerbi.com').
+            authority_url (str): The Azure AD authority to request tokens from (default is 'https://login.microsoftonline.com').
+            session (requests.Session, optional): A session to send requests through, reusing its connections.
+            token_cache (optional): An object with get(key) and set(key, token, expires_in) methods, such as
+                FileTokenCache, used to share access tokens between clients and processes.
+            rate_limiter (optional): An object with acquire(dataset_id) and block(dataset_id, seconds) methods, such as
+                FileRateLimiter, used to pace row requests per dataset and to share 429 back-off between processes.
         """
         self.client_id = client_id
         self.client_secret = client_secret
         self.tenant_id = tenant_id
         self.api_version = api_version
+        self.api_url = api_url.rstrip('/')
+        self.authority_url = authority_url.rstrip('/')
         self.access_token = None
         self.headers = None
+        self.instrumentation = instrumentation if instrumentation is not None else NULL_INSTRUMENTATION
+        self.max_retries = max_retries
+        self.max_retry_wait = max_retry_wait
+        self.session = session
+        self.token_cache = token_cache
+        self.rate_limiter = rate_limiter
+
+    def _request(self, method, url, operation, dataset_id=None, **kwargs):
+        """
+        Sends an HTTP request, waiting and retrying while the API responds with 429, and records request metrics.
+
+        Parameters:
+            method (str): The HTTP method, e.g. 'get' or 'post'.
+            url (str): The URL to send the request to.
+            operation (str): The operation label recorded with the request metrics.
+            dataset_id (str, optional): The dataset the request writes to. When set, the request is paced and
+                backed off through the rate limiter, if one is configured.
+            **kwargs: Passed to the requests function.
+
+        Returns:
+            requests.Response: The final response.
+        """
+        import requests
+
+        instrumentation = self.instrumentation
+        send = getattr(self.session if self.session is not None else requests, method)
+        rate_limiter = self.rate_limiter if dataset_id is not None else None
+        for attempt in range(self.max_retries + 1):
+            if rate_limiter is not None:
+                waited = rate_limiter.acquire(dataset_id)
+                if waited:
+                    instrumentation.inc('powerbiapi_rate_limiter_wait_seconds_total', waited,
+                                        client=self._metrics_client, operation=operation)
+            start = time.perf_counter()
+            resp = send(url, **kwargs)
+            instrumentation.record_request(self._metrics_client, operation, resp, time.perf_counter() - start)
+            if resp.status_code != 429 or attempt == self.max_retries:
+                return resp
+            try:
+                wait = float(resp.headers.get('Retry-After', 1))
+            except ValueError:
+                wait = 1.0
+            if wait > self.max_retry_wait:
+                instrumentation.event('rate_limited', f"Rate limited during {operation} for {wait} seconds, "
+                                      f"longer than max_retry_wait; not retrying.", operation=operation, wait=wait,
+                                      attempt=attempt + 1)
+                return resp
+            instrumentation.event('rate_limited', f"Rate limited during {operation}, retrying in {wait} seconds.",
+                                  operation=operation, wait=wait, attempt=attempt + 1)
+            instrumentation.inc('powerbiapi_rate_limit_wait_seconds_total', wait,
+                                client=self._metrics_client, operation=operation)
+            if rate_limiter is not None:
+                # The next acquire waits out the block, in this and every other process sharing the limiter
+                rate_limiter.block(dataset_id, wait)
+            else:
+                time.sleep(wait)
+        return resp
 
     def connect(self):
         """
         Creates an access token and sets the headers for API requests.
+
+        If a token cache is configured, an unexpired cached token is reused instead of requesting a new one.
         """
-        auth_url = f"https://login.microsoftonline.com/{self.tenant_id}/oauth2/token"
+        cache_key = f"{self.authority_url}/{self.tenant_id}:{self.client_id}:powerbi"
+        if self.token_cache is not None:
+            token = self.token_cache.get(cache_key)
+            if token is not None:
+                self.access_token = token
+                self.headers = {'Authorization': f'Bearer {self.access_token}'}
+                return
+        auth_url = f"{self.authority_url}/{self.tenant_id}/oauth2/token"
         auth_data = {
             'grant_type': 'client_credentials',
             'client_id': self.client_id,
             'client_secret': self.client_secret,
             'resource': 'https://analysis.windows.net/powerbi/api'
         }
-        auth_resp = requests.post(auth_url, data=auth_data)
+        auth_resp = self._request('post', auth_url, 'connect', data=auth_data)
         if auth_resp.status_code == 200:
-            self.access_token = auth_resp.json()['access_token']
+            self.instrumentation.inc('powerbiapi_auth_refreshes_total', client=self._metrics_client)
+            auth_json = auth_resp.json()
+            self.access_token = auth_json['access_token']
             self.headers = {'Authorization': f'Bearer {self.access_token}'}
+            if self.token_cache is not None:
+                self.token_cache.set(cache_key, self.access_token, int(auth_json.get('expires_in', 3600)))
         else:
             raise ValueError(f"""Could not authenticate with Power BI API. Error {
                 auth_resp.status_code
@@ -44,6 +138,31 @@ class PowerBIDataSource:
                 auth_resp.text
                 }""")
 
+    def _get_table(self, dataset_id, table_name):
+        """
+        Looks up a table by name in the specified dataset.
+
+        Parameters:
+            dataset_id (str): The ID of the dataset containing the table.
+            table_name (str): The name of the table to look up.
+
+        Raises:
+            ValueError: If the specified dataset or table does not exist in the workspace, or if the API returns an error.
+
+        Returns:
+            dict: The table object returned by the Power BI API.
+        """
+        tables_url = f'{self.api_url}/{self.api_version}/myorg/groups/{dataset_id}/tables'
+        tables_resp = self._request('get', tables_url, 'get_table', headers=self.headers)
+        if tables_resp.status_code != 200:
+            raise ValueError(f"Could not retrieve tables from Power BI API. Error {tables_resp.status_code}: {tables_resp.text}")
+        tables = tables_resp.json()['value']
+        table = next((t for t in tables if t['name'] == table_name), None)
+        if table is None:
+            raise ValueError(f"Table {table_name} does not exist in dataset {dataset_id}.")
+        return table
+
+    @instrumented('create_table')
     def create_table(self, dataset_id, table_name, table_definition):
         """
         Creates a new table in the specified dataset.
@@ -62,8 +181,8 @@ class PowerBIDataSource:
         self.connect()
 
         # Check if the specified dataset exists in the workspace
-        datasets_url = f'https://api.powerbi.com/{self.api_version}/myorg/groups/{dataset_id}/datasets'
-        datasets_resp = requests.get(datasets_url, headers=self.headers)
+        datasets_url = f'{self.api_url}/{self.api_version}/myorg/groups/{dataset_id}/datasets'
+        datasets_resp = self._request('get', datasets_url, 'get_datasets', headers=self.headers)
         if datasets_resp.status_code != 200:
             raise ValueError(f"Could not retrieve datasets from Power BI API. Error {datasets_resp.status_code}: {datasets_resp.text}")
         datasets = datasets_resp.json()['value']
@@ -71,7 +190,7 @@ class PowerBIDataSource:
             raise ValueError(f"Dataset {dataset_id} does not exist in the workspace.")
 
         # Create the table
-        tables_url = f'https://api.powerbi.com/{self.api_version}/myorg/groups/{dataset_id}/tables'
+        tables_url = f'{self.api_url}/{self.api_version}/myorg/groups/{dataset_id}/tables'
         table_data = {
             'name': table_name,
             'columns': [
@@ -81,11 +200,12 @@ class PowerBIDataSource:
                 } for col in table_definition
             ]
         }
-        table_resp = requests.post(tables_url, headers=self.headers, json=table_data)
+        table_resp = self._request('post', tables_url, 'create_table', headers=self.headers, json=table_data)
         if table_resp.status_code != 201:
             raise ValueError(f"Could not create table. Error {table_resp.status_code}: {table_resp.text}")
 
-    def append_rows(self, dataset_id, table_name, rows):
+    @instrumented('append_rows')
+    def append_rows(self, dataset_id, table_name, rows, batch_size=None, on_batch=None):
         """
         Appends rows to an existing table in the specified dataset.
 
@@ -93,32 +213,51 @@ class PowerBIDataSource:
             dataset_id (str): The ID of the dataset containing the table to append rows to.
             table_name (str): The name of the table to append rows to.
             rows (list of dict): A list of dictionaries representing the rows to be appended.
+            batch_size (int, optional): The maximum number of rows per request. The rows are posted in consecutive
+                batches after a single authentication and table lookup. All rows are sent in one request if omitted.
+            on_batch (callable, optional): Called with each batch of rows after it has been appended.
 
         Raises:
-            ValueError: If the specified dataset or table does not exist in the workspace, or if the API returns an error.
+            ValueError: If the specified dataset or table does not exist in the workspace, if the API returns an error,
+            or if batch_size is not positive.
 
         Returns:
             None
         """
+        if batch_size is not None and batch_size < 1:
+            raise ValueError("batch_size must be a positive integer.")
         self.connect()
 
         # Check if the specified dataset and table exist in the workspace
-        tables_url = f'https://api.powerbi.com/{self.api_version}/myorg/groups/{dataset_id}/tables'
-        tables_resp = requests.get(tables_url, headers=self.headers)
-        if tables_resp.status_code != 200:
-            raise ValueError(f"Could not retrieve tables from Power BI API. Error {tables_resp.status_code}: {tables_resp.text}")
-        tables = tables_resp.json()['value']
-        table = next((t for t in tables if t['name'] == table_name), None)
-        if table is None:
-            raise ValueError(f"Table {table_name} does not exist in dataset {dataset_id}.")
+        table = self._get_table(dataset_id, table_name)
 
         # Append the rows to the table
-        rows_url = f'''https://api.powerbi.com/{
+        batches = [rows] if batch_size is None else self._chunk(rows, batch_size)
+        for batch in batches:
+            self._post_rows(dataset_id, table, batch)
+            if on_batch is not None:
+                on_batch(batch)
+
+    def _post_rows(self, dataset_id, table, rows):
+        """
+        Posts one request of rows to a table that has already been looked up.
+
+        Parameters:
+            dataset_id (str): The ID of the dataset containing the table.
+            table (dict): The table object returned by _get_table.
+            rows (list of dict): A list of dictionaries representing the rows to be appended.
+
+        Raises:
+            ValueError: If the API returns an error.
+        """
+        rows_url = f'''{self.api_url}/{
             self.api_version
             }/myorg/groups/{
                 dataset_id
                 }/tables/{table["id"]}/rows'''
-        rows_resp = requests.post(rows_url, headers=self.headers, json={'rows': rows})
+        self.instrumentation.observe('powerbiapi_rows_per_call', len(rows), client=self._metrics_client, operation='append_rows')
+        rows_resp = self._request('post', rows_url, 'append_rows', dataset_id=dataset_id,
+                                  headers=self.headers, json={'rows': rows})
         if rows_resp.status_code != 200 and rows_resp.status_code != 201:
             raise ValueError(
                 f"""Could not append rows to table. Error {
@@ -127,7 +266,9 @@ class PowerBIDataSource:
                         rows_resp.text
                         }"""
                 )
-    def update_rows(self, dataset_id, table_name, update_query):
+
+    @instrumented('update_rows')
+    def update_rows(self, dataset_id, table_name, update_query, confirm=None):
         """
         Updates rows in an existing table in the specified dataset.
 
@@ -135,6 +276,9 @@ class PowerBIDataSource:
             dataset_id (str): The ID of the dataset containing the table to update rows in.
             table_name (str): The name of the table to update rows in.
             update_query (str): A string representing the update query.
+            confirm (bool or callable, optional): Confirmation policy for the update. None (the default) prompts
+                interactively, True skips the prompt, False cancels, and a callable receives
+                (dataset_id, table_name, update_query) and returns True to proceed.
 
         Raises:
             ValueError: If the specified dataset or table does not exist in the workspace, or if the API returns an error.
@@ -145,28 +289,22 @@ class PowerBIDataSource:
         self.connect()
 
         # Check if the specified dataset and table exist in the workspace
-        tables_url = f'https://api.powerbi.com/{self.api_version}/myorg/groups/{dataset_id}/tables'
-        tables_resp = requests.get(tables_url, headers=self.headers)
-        if tables_resp.status_code != 200:
-            raise ValueError(f"Could not retrieve tables from Power BI API. Error {tables_resp.status_code}: {tables_resp.text}")
-        tables = tables_resp.json()['value']
-        table = next((t for t in tables if t['name'] == table_name), None)
-        if table is None:
-            raise ValueError(f"Table {table_name} does not exist in dataset {dataset_id}.")
+        table = self._get_table(dataset_id, table_name)
 
-        # Prompt to verify the update
-        print(f"Are you sure you want to update rows in table {table_name} in dataset {dataset_id}?")
-        choice = input("Enter 'yes' to continue or 'no' to cancel: ")
-        if choice.lower() != 'yes':
-            print("Update cancelled.")
+        # Verify the update
+        prompt = f"Are you sure you want to update rows in table {table_name} in dataset {dataset_id}?"
+        if not self._confirmed(confirm, prompt, dataset_id, table_name, update_query):
+            self.instrumentation.event('update_cancelled', "Update cancelled.", dataset_id=dataset_id, table_name=table_name)
             return
 
         # Update the rows in the table
-        update_url = f'https://api.powerbi.com/{self.api_version}/myorg/groups/{dataset_id}/tables/{table["id"]}/rows'
-        update_resp = requests.patch(update_url, headers=self.headers, json={'updateDetails': update_query})
+        update_url = f'{self.api_url}/{self.api_version}/myorg/groups/{dataset_id}/tables/{table["id"]}/rows'
+        update_resp = self._request('patch', update_url, 'update_rows', dataset_id=dataset_id,
+                                    headers=self.headers, json={'updateDetails': update_query})
         if update_resp.status_code != 200:
             raise ValueError(f"Could not update rows in table. Error {update_resp.status_code}: {update_resp.text}")
 
+    @instrumented('delete_rows')
     def delete_rows(self, dataset_id, table_name, delete_query):
         """
         Deletes rows from an existing table in the specified dataset.
@@ -185,21 +323,249 @@ class PowerBIDataSource:
         self.connect()
 
         # Check if the specified dataset and table exist in the workspace
-        tables_url = f'https://api.powerbi.com/{self.api_version}/myorg/groups/{dataset_id}/tables'
-        tables_resp = requests.get(tables_url, headers=self.headers)
-        if tables_resp.status_code != 200:
-            raise ValueError(f"Could not retrieve tables from Power BI API. Error {tables_resp.status_code}: {tables_resp.text}")
-        tables = tables_resp.json()['value']
-        table = next((t for t in tables if t['name'] == table_name), None)
-        if table is None:
-            raise ValueError(f"Table {table_name} does not exist in dataset {dataset_id}.")
+        table = self._get_table(dataset_id, table_name)
 
         # Delete the rows from the table
-        delete_url = f'https://api.powerbi.com/{self.api_version}/myorg/groups/{dataset_id}/tables/{table["id"]}/rows'
-        delete_resp = requests.delete(delete_url, headers=self.headers, json={'deleteDetails': delete_query})
+        delete_url = f'{self.api_url}/{self.api_version}/myorg/groups/{dataset_id}/tables/{table["id"]}/rows'
+        delete_resp = self._request('delete', delete_url, 'delete_rows', dataset_id=dataset_id,
+                                    headers=self.headers, json={'deleteDetails': delete_query})
         if delete_resp.status_code == 200:
-            print(f"Rows deleted from table {table_name} in dataset {dataset_id}.")
+            self.instrumentation.event('rows_deleted', f"Rows deleted from table {table_name} in dataset {dataset_id}.",
+                                       dataset_id=dataset_id, table_name=table_name)
         else:
             error = delete_resp.json()['error']
             message = error.get('message', 'Unknown error')
-            raise ValueError(f"Could not delete rows from table. Error {delete_resp.status_code}: {message}")
\ No newline at end of file
+            raise ValueError(f"Could not delete rows from table. Error {delete_resp.status_code}: {message}")
+
+    @staticmethod
+    def _format_literal(value):
+        """
+        Formats a Python value as a literal for use in a delete or update query.
+        """
+        if value is None:
+            return 'null'
+        if isinstance(value, bool):
+            return 'true' if value else 'false'
+        if isinstance(value, (int, float)):
+            return str(value)
+        escaped = str(value).replace("'", "''")
+        return f"'{escaped}'"
+
+    @staticmethod
+    def _confirmed(confirm, prompt, *args):
+        """
+        Applies a confirmation policy: None prompts interactively with the given prompt, True proceeds, False cancels,
+        and a callable is called with args and returns True to proceed.
+
+        Returns:
+            bool: Whether to proceed.
+        """
+        if confirm is None:
+            print(prompt)
+            choice = input("Enter 'yes' to continue or 'no' to cancel: ")
+            return choice.lower() == 'yes'
+        if callable(confirm):
+            return bool(confirm(*args))
+        return bool(confirm)
+
+    @staticmethod
+    def _check_bulk_confirm(confirm):
+        """
+        Rejects the interactive confirmation policy, which the bulk methods never use.
+
+        Raises:
+            ValueError: If confirm is None.
+        """
+        if confirm is None:
+            raise ValueError("confirm must be True, False or a callable; bulk operations never prompt.")
+
+    @staticmethod
+    def _chunk(keys, batch_size):
+        """
+        Splits a list of keys into lists of at most batch_size keys.
+        """
+        return [keys[i:i + batch_size] for i in range(0, len(keys), batch_size)]
+
+    def _run_batches(self, dataset_id, table_name, batches, send, confirm, max_workers):
+        """
+        Sends a list of batches with bounded concurrency and collects per-batch outcomes.
+
+        Parameters:
+            dataset_id (str): The ID of the dataset containing the table.
+            table_name (str): The name of the table.
+            batches (list of dict): Batches with at least 'keys' and 'query' entries.
+            send (callable): Called with (rows_url, query) and returns a response.
+            confirm (bool or callable): Confirmation policy, as accepted by _confirmed; a callable receives
+                (dataset_id, table_name, batch). It is evaluated for every batch on the calling thread before any
+                request is sent.
+            max_workers (int): The maximum number of requests in flight at once.
+
+        Returns:
+            list of dict: One outcome per batch, in batch order.
+        """
+        if not batches:
+            return []
+
+        outcomes = [
+            {
+                'batch': index,
+                'keys': batch['keys'],
+                'status': 'skipped',
+                'status_code': None,
+                'error': None,
+            } for index, batch in enumerate(batches)
+        ]
+        prompt = f"Are you sure you want to change rows in table {table_name} in dataset {dataset_id}?"
+        approved = [
+            index for index, batch in enumerate(batches)
+            if self._confirmed(confirm, prompt, dataset_id, table_name, batch)
+        ]
+
+        if approved:
+            from concurrent.futures import ThreadPoolExecutor
+
+            self.connect()
+            table = self._get_table(dataset_id, table_name)
+            rows_url = f'{self.api_url}/{self.api_version}/myorg/groups/{dataset_id}/tables/{table["id"]}/rows'
+
+        def run(index):
+            outcome = outcomes[index]
+            # Any exception fails only this batch, so the outcomes of batches already sent are still returned
+            try:
+                resp = send(rows_url, batches[index]['query'])
+            except Exception as e:
+                outcome['status'] = 'failed'
+                outcome['error'] = f'{type(e).__name__}: {e}'
+                return outcome
+            outcome['status_code'] = resp.status_code
+            if resp.status_code == 200:
+                outcome['status'] = 'ok'
+            else:
+                outcome['status'] = 'failed'
+                outcome['error'] = resp.text
+            return outcome
+
+        if approved:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(approved)))) as executor:
+                for future in [executor.submit(run, index) for index in approved]:
+                    future.result()
+        statuses = [o['status'] for o in outcomes]
+        self.instrumentation.event(
+            'batches_completed',
+            f"{statuses.count('ok')} of {len(outcomes)} batches succeeded for table {table_name} in dataset {dataset_id}.",
+            dataset_id=dataset_id, table_name=table_name, ok=statuses.count('ok'),
+            failed=statuses.count('failed'), skipped=statuses.count('skipped'),
+        )
+        return outcomes
+
+    @instrumented('delete_rows_by_keys')
+    def delete_rows_by_keys(self, dataset_id, table_name, key_column, keys, confirm=True,
+                            batch_size=DEFAULT_KEYS_PER_REQUEST, max_workers=4):
+        """
+        Deletes the rows whose key column matches any of the given keys, without prompting.
+
+        Keys are grouped into as few delete requests as batch_size allows and the requests are sent
+        concurrently, reusing a single authentication and table lookup. Each request sends the statement
+        "delete from <table_name> where <key_column> in (<keys>)" as its deleteDetails.
+
+        Parameters:
+            dataset_id (str): The ID of the dataset containing the table to delete rows from.
+            table_name (str): The name of the table to delete rows from.
+            key_column (str): The name of the column the keys refer to.
+            keys (iterable): The key values of the rows to delete.
+            confirm (bool or callable, optional): Confirmation policy. True (the default) sends every batch,
+                False skips every batch, and a callable receives (dataset_id, table_name, batch) and returns
+                True to send that batch. The callable is evaluated for every batch before any request is sent.
+                None is rejected, since these methods never prompt.
+            batch_size (int, optional): The maximum number of keys per request.
+            max_workers (int, optional): The maximum number of requests in flight at once.
+
+        Raises:
+            ValueError: If the specified dataset or table does not exist in the workspace, if batch_size is not
+            positive, or if confirm is None.
+
+        Returns:
+            list of dict: One outcome per batch with 'batch', 'keys', 'status' ('ok', 'failed' or 'skipped'),
+            'status_code' and 'error' entries.
+        """
+        self._check_bulk_confirm(confirm)
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer.")
+        # Preserve order while dropping duplicate keys
+        keys = list(dict.fromkeys(keys))
+        batches = [
+            {
+                'keys': chunk,
+                'query': f"delete from {table_name} where {key_column} in ({', '.join(self._format_literal(k) for k in chunk)})",
+            } for chunk in self._chunk(keys, batch_size)
+        ]
+
+        def send(rows_url, query):
+            return self._request('delete', rows_url, 'delete_rows_by_keys', dataset_id=dataset_id,
+                                 headers=self.headers, json={'deleteDetails': query})
+
+        return self._run_batches(dataset_id, table_name, batches, send, confirm, max_workers)
+
+    @instrumented('update_rows_by_keys')
+    def update_rows_by_keys(self, dataset_id, table_name, key_column, updates, confirm=True,
+                            batch_size=DEFAULT_KEYS_PER_REQUEST, max_workers=4):
+        """
+        Updates the rows identified by key, without prompting.
+
+        Keys that receive identical new values are grouped into as few update requests as batch_size
+        allows and the requests are sent concurrently, reusing a single authentication and table lookup.
+        Each request sends the statement "update <table_name> set <column> = <value>, ... where <key_column>
+        in (<keys>)" as its updateDetails.
+
+        Parameters:
+            dataset_id (str): The ID of the dataset containing the table to update rows in.
+            table_name (str): The name of the table to update rows in.
+            key_column (str): The name of the column the keys refer to.
+            updates (dict or iterable of (key, dict)): Maps each key to a dictionary of column names and new values.
+                If a key appears more than once, its last update is used.
+            confirm (bool or callable, optional): Confirmation policy. True (the default) sends every batch,
+                False skips every batch, and a callable receives (dataset_id, table_name, batch) and returns
+                True to send that batch. The callable is evaluated for every batch before any request is sent.
+                None is rejected, since these methods never prompt.
+            batch_size (int, optional): The maximum number of keys per request.
+            max_workers (int, optional): The maximum number of requests in flight at once.
+
+        Raises:
+            ValueError: If the specified dataset or table does not exist in the workspace, if batch_size is not
+            positive, if confirm is None, or if an update has no values.
+
+        Returns:
+            list of dict: One outcome per batch with 'batch', 'keys', 'status' ('ok', 'failed' or 'skipped'),
+            'status_code' and 'error' entries.
+        """
+        self._check_bulk_confirm(confirm)
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer.")
+        if isinstance(updates, dict):
+            updates = updates.items()
+
+        # The last update given for a key wins, so no key is sent in two concurrent requests
+        latest = {}
+        for key, values in updates:
+            if not values:
+                raise ValueError(f"Update for key {key!r} has no values.")
+            latest[key] = values
+
+        # Group keys by the assignment they receive, independent of the order the columns were given in
+        groups = {}
+        for key, values in latest.items():
+            assignment = ', '.join(f"{col} = {self._format_literal(val)}" for col, val in sorted(values.items()))
+            groups.setdefault(assignment, []).append(key)
+
+        batches = [
+            {
+                'keys': chunk,
+                'query': f"update {table_name} set {assignment} where {key_column} in ({', '.join(self._format_literal(k) for k in chunk)})",
+            } for assignment, group_keys in groups.items() for chunk in self._chunk(group_keys, batch_size)
+        ]
+
+        def send(rows_url, query):
+            return self._request('patch', rows_url, 'update_rows_by_keys', dataset_id=dataset_id,
+                                 headers=self.headers, json={'updateDetails': query})
+
+        return self._run_batches(dataset_id, table_name, batches, send, confirm, max_workers)
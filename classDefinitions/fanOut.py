@@ -0,0 +1,329 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+# Power BI accepts at most 10,000 rows per push request.
+MAX_ROWS_PER_REQUEST = 10000
+
+# Power BI accepts at most 120 row push requests per minute per dataset.
+MAX_REQUESTS_PER_MINUTE = 120
+
+# Rate-limited requests are retried this many times by each worker, unless max_retries is passed.
+DEFAULT_MAX_RETRIES = 3
+
+# PowerBIDataSource arguments set by each worker, which cannot be passed through FanOutRunner.
+RESERVED_CLIENT_KWARGS = frozenset({'session', 'token_cache', 'rate_limiter'})
+
+# Cached tokens are treated as expired this many seconds early.
+TOKEN_EXPIRY_MARGIN = 300
+
+
+@contextmanager
+def _file_lock(path):
+    """
+    Holds an exclusive lock on a lock file for the duration of the block, across processes.
+    """
+    with open(path, 'a+') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _read_state(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_state(path, state):
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    # State files may hold bearer tokens, so only the owner may read them
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    if hasattr(os, 'fchmod'):
+        # The mode above is ignored if a stale temp file already exists
+        os.fchmod(fd, 0o600)
+    with os.fdopen(fd, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+class FileTokenCache:
+    """
+    An access token cache stored in a JSON file, shared by every process that opens the same path.
+    """
+
+    def __init__(self, path):
+        """
+        Constructor for the FileTokenCache class.
+
+        Parameters:
+            path (str): The path of the cache file. It is created on first write.
+        """
+        self.path = path
+        self.lock_path = f'{path}.lock'
+
+    def get(self, key):
+        """
+        Returns the cached token for a key, or None if there is none or it is about to expire.
+        """
+        with _file_lock(self.lock_path):
+            entry = _read_state(self.path).get(key)
+        if entry is None or entry['expires_at'] - TOKEN_EXPIRY_MARGIN <= time.time():
+            return None
+        return entry['token']
+
+    def set(self, key, token, expires_in):
+        """
+        Stores a token for a key.
+
+        Parameters:
+            key (str): The cache key.
+            token (str): The access token.
+            expires_in (int): The number of seconds until the token expires.
+        """
+        with _file_lock(self.lock_path):
+            state = _read_state(self.path)
+            state[key] = {'token': token, 'expires_at': time.time() + expires_in}
+            _write_state(self.path, state)
+
+
+class FileRateLimiter:
+    """
+    Paces requests per dataset across processes through a JSON state file.
+
+    Each dataset gets at most max_requests_per_minute evenly spaced request slots, and a block() after a 429 response
+    holds back every process until the Retry-After interval has passed.
+    """
+
+    def __init__(self, path, max_requests_per_minute=MAX_REQUESTS_PER_MINUTE):
+        """
+        Constructor for the FileRateLimiter class.
+
+        Parameters:
+            path (str): The path of the state file. It is created on first use.
+            max_requests_per_minute (int): The maximum number of requests per dataset per minute; 0 disables pacing
+                so that only block() delays requests (default is 120).
+        """
+        self.path = path
+        self.lock_path = f'{path}.lock'
+        self.interval = 60.0 / max_requests_per_minute if max_requests_per_minute else 0.0
+
+    def acquire(self, dataset_id):
+        """
+        Reserves the next request slot for a dataset and sleeps until it arrives.
+
+        Returns:
+            float: The number of seconds slept.
+        """
+        with _file_lock(self.lock_path):
+            now = time.time()
+            state = _read_state(self.path)
+            entry = state.get(dataset_id, {})
+            slot = max(now, entry.get('next', 0), entry.get('blocked_until', 0))
+            entry['next'] = slot + self.interval
+            state[dataset_id] = entry
+            _write_state(self.path, state)
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+        return max(wait, 0.0)
+
+    def block(self, dataset_id, seconds):
+        """
+        Holds back requests for a dataset, in every process, for the given number of seconds.
+        """
+        with _file_lock(self.lock_path):
+            state = _read_state(self.path)
+            entry = state.get(dataset_id, {})
+            entry['blocked_until'] = max(entry.get('blocked_until', 0), time.time() + seconds)
+            state[dataset_id] = entry
+            _write_state(self.path, state)
+
+
+# The PowerBIDataSource used by the current worker process, created by _init_worker.
+_worker_client = None
+
+
+def _init_worker(client_args, client_kwargs, token_cache_path, rate_limit_path, max_requests_per_minute):
+    import requests
+    from classDefinitions.dataSource import PowerBIDataSource
+
+    global _worker_client
+    _worker_client = PowerBIDataSource(
+        *client_args,
+        session=requests.Session(),
+        token_cache=FileTokenCache(token_cache_path),
+        rate_limiter=FileRateLimiter(rate_limit_path, max_requests_per_minute),
+        **client_kwargs
+    )
+
+
+def _push_item(index, item, batch_size):
+    start = time.perf_counter()
+    result = {
+        'index': index,
+        'workspace_id': item.get('workspace_id'),
+        'dataset_id': item['dataset_id'],
+        'table_name': item['table_name'],
+        'rows': 0,
+        'batches': 0,
+        'status': 'ok',
+        'error': None,
+        'pid': os.getpid(),
+    }
+
+    def count_batch(batch):
+        result['batches'] += 1
+        result['rows'] += len(batch)
+
+    try:
+        rows = item['rows']
+        # Building the rows in the worker keeps row shaping off the parent process
+        if callable(rows):
+            rows = rows()
+        _worker_client.append_rows(item['dataset_id'], item['table_name'], rows, batch_size=batch_size, on_batch=count_batch)
+    except Exception as e:
+        result['status'] = 'failed'
+        result['error'] = f'{type(e).__name__}: {e}'
+    result['elapsed'] = time.perf_counter() - start
+    return result
+
+
+def _failed_result(index, item, error):
+    return {
+        'index': index,
+        'workspace_id': item.get('workspace_id') if isinstance(item, dict) else None,
+        'dataset_id': item.get('dataset_id') if isinstance(item, dict) else None,
+        'table_name': item.get('table_name') if isinstance(item, dict) else None,
+        'rows': 0,
+        'batches': 0,
+        'status': 'failed',
+        'error': f'{type(error).__name__}: {error}',
+        'pid': None,
+        'elapsed': 0.0,
+    }
+
+
+class FanOutRunner:
+    """
+    Pushes rows to many Power BI datasets and tables in parallel across a pool of worker processes.
+
+    Each worker keeps one PowerBIDataSource with its own requests session. Workers share an access token cache and a
+    per-dataset rate limiter through files in state_dir.
+    """
+
+    def __init__(self, client_id, client_secret, tenant_id, processes=None, state_dir=None,
+                 max_requests_per_minute=MAX_REQUESTS_PER_MINUTE, batch_size=MAX_ROWS_PER_REQUEST, **client_kwargs):
+        """
+        Constructor for the FanOutRunner class.
+
+        Parameters:
+            client_id (str): The client ID for the Azure Active Directory application.
+            client_secret (str): The client secret for the Azure Active Directory application.
+            tenant_id (str): The ID of the Azure Active Directory tenant.
+            processes (int, optional): The number of worker processes. Defaults to the number of CPUs.
+            state_dir (str, optional): A directory for the shared token cache and rate limiter state. A temporary
+                directory is used if omitted.
+            max_requests_per_minute (int): The maximum number of row requests per dataset per minute, across all
+                workers (default is 120).
+            batch_size (int): The maximum number of rows per request (default is 10000).
+            **client_kwargs: Passed to each worker's PowerBIDataSource, e.g. api_version or api_url. max_retries
+                defaults to 3, since the shared rate limiter backs every worker off after a 429 response.
+
+        Raises:
+            ValueError: If batch_size is not between 1 and 10000, or if client_kwargs includes session, token_cache or
+            rate_limiter, which each worker sets itself.
+        """
+        if not 1 <= batch_size <= MAX_ROWS_PER_REQUEST:
+            raise ValueError(f"batch_size must be between 1 and {MAX_ROWS_PER_REQUEST}.")
+        reserved = sorted(RESERVED_CLIENT_KWARGS.intersection(client_kwargs))
+        if reserved:
+            raise ValueError(f"{', '.join(reserved)} cannot be passed to FanOutRunner; each worker sets its own.")
+        self.client_args = (client_id, client_secret, tenant_id)
+        self.client_kwargs = dict({'max_retries': DEFAULT_MAX_RETRIES}, **client_kwargs)
+        self.processes = processes
+        self.state_dir = state_dir
+        self.max_requests_per_minute = max_requests_per_minute
+        self.batch_size = batch_size
+
+    def run(self, items, progress=None):
+        """
+        Pushes every work item and returns an aggregated report.
+
+        Parameters:
+            items (iterable of dict): Work items with 'dataset_id', 'table_name' and 'rows' entries, and optionally
+                'workspace_id' for reporting. 'rows' is a list of dictionaries, or a picklable callable returning one
+                so that rows are built in the worker.
+            progress (callable, optional): Called in this process as progress(completed, total, result) after each
+                item finishes.
+
+        Returns:
+            dict: A report with 'items', 'succeeded', 'failed', 'rows', 'elapsed', 'rows_per_sec', 'failures'
+            (the failed item results) and 'results' (one result per item, in input order).
+        """
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        items = list(items)
+        state_dir = self.state_dir or tempfile.mkdtemp(prefix='powerbi-fanout-')
+        start = time.perf_counter()
+        results = [None] * len(items)
+        try:
+            os.makedirs(state_dir, mode=0o700, exist_ok=True)
+            initargs = (
+                self.client_args,
+                self.client_kwargs,
+                os.path.join(state_dir, 'tokens.json'),
+                os.path.join(state_dir, 'rate_limits.json'),
+                self.max_requests_per_minute,
+            )
+            with ProcessPoolExecutor(max_workers=self.processes, initializer=_init_worker, initargs=initargs) as executor:
+                futures = {executor.submit(_push_item, i, item, self.batch_size): i for i, item in enumerate(items)}
+                for completed, future in enumerate(as_completed(futures), 1):
+                    index = futures[future]
+                    # An item that cannot be pickled, or a pool broken by a dead worker, fails only the
+                    # affected futures; items that already finished keep their results
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = _failed_result(index, items[index], e)
+                    results[index] = result
+                    if progress is not None:
+                        progress(completed, len(items), result)
+        finally:
+            if self.state_dir is None:
+                shutil.rmtree(state_dir, ignore_errors=True)
+        elapsed = time.perf_counter() - start
+
+        failures = [r for r in results if r['status'] != 'ok']
+        rows = sum(r['rows'] for r in results)
+        return {
+            'items': len(results),
+            'succeeded': len(results) - len(failures),
+            'failed': len(failures),
+            'rows': rows,
+            'elapsed': elapsed,
+            'rows_per_sec': rows / elapsed if elapsed else None,
+            'failures': failures,
+            'results': results,
+        }
@@ -0,0 +1,261 @@
+import functools
+import threading
+import time
+from contextlib import nullcontext
+
+_logger = None
+
+
+def _get_logger():
+    global _logger
+    if _logger is None:
+        import logging
+        _logger = logging.getLogger(__name__)
+    return _logger
+
+
+# Default histogram buckets for durations, in seconds.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+# Default histogram buckets for row counts.
+ROW_BUCKETS = (1, 10, 100, 1000, 10000, 100000, 1000000, float('inf'))
+
+# Metrics recorded by the clients: name -> (type, help text, buckets).
+METRICS = {
+    'powerbiapi_operation_duration_seconds': ('histogram', 'Duration of client operations.', LATENCY_BUCKETS),
+    'powerbiapi_request_duration_seconds': ('histogram', 'Duration of individual HTTP requests.', LATENCY_BUCKETS),
+    'powerbiapi_requests_total': ('counter', 'HTTP requests sent, by response status.', None),
+    'powerbiapi_request_bytes_total': ('counter', 'Bytes sent in HTTP request bodies.', None),
+    'powerbiapi_rows_per_call': ('histogram', 'Rows sent or returned per operation.', ROW_BUCKETS),
+    'powerbiapi_auth_refreshes_total': ('counter', 'Access tokens requested.', None),
+    'powerbiapi_reflection_duration_seconds': ('histogram', 'Duration of database table reflection.', LATENCY_BUCKETS),
+    'powerbiapi_rate_limit_wait_seconds_total': ('counter', 'Time spent waiting on rate-limited (429) responses.', None),
+    'powerbiapi_rate_limiter_wait_seconds_total': ('counter', 'Time spent waiting for a request slot from a shared rate limiter.', None),
+}
+
+
+class MetricsRegistry:
+    """
+    A thread-safe, in-process registry of counters and histograms that renders in the Prometheus/OpenMetrics text format.
+    """
+
+    def __init__(self, metrics=None):
+        """
+        Constructor for the MetricsRegistry class.
+
+        Parameters:
+            metrics (dict, optional): Maps metric names to (type, help text, buckets). Defaults to METRICS.
+        """
+        self.metrics = dict(METRICS if metrics is None else metrics)
+        self._lock = threading.Lock()
+        self._values = {name: {} for name in self.metrics}
+
+    @staticmethod
+    def _key(labels):
+        return tuple(sorted(labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        """
+        Increments a counter.
+
+        Raises:
+            KeyError: If the metric is not registered.
+        """
+        key = self._key(labels)
+        with self._lock:
+            series = self._values[name]
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        """
+        Records an observation in a histogram.
+
+        Raises:
+            KeyError: If the metric is not registered.
+        """
+        buckets = self.metrics[name][2]
+        key = self._key(labels)
+        with self._lock:
+            series = self._values[name]
+            state = series.get(key)
+            if state is None:
+                state = series[key] = {'buckets': [0] * len(buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    state['buckets'][i] += 1
+            state['sum'] += value
+            state['count'] += 1
+
+    def get(self, name, **labels):
+        """
+        Returns the current value of a counter, or the {'buckets', 'sum', 'count'} state of a histogram.
+        Returns None if nothing has been recorded for the given labels.
+        """
+        with self._lock:
+            value = self._values[name].get(self._key(labels))
+            if isinstance(value, dict):
+                value = {'buckets': list(value['buckets']), 'sum': value['sum'], 'count': value['count']}
+            return value
+
+    def reset(self):
+        """
+        Clears all recorded values.
+        """
+        with self._lock:
+            self._values = {name: {} for name in self.metrics}
+
+    @staticmethod
+    def _format_labels(labels, extra=()):
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ''
+        body = ','.join('{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"')) for k, v in pairs)
+        return '{' + body + '}'
+
+    def render(self):
+        """
+        Renders all recorded metrics in the OpenMetrics text format.
+
+        Returns:
+            str: The exposition text, terminated by '# EOF'.
+        """
+        lines = []
+        with self._lock:
+            for name, (metric_type, help_text, buckets) in self.metrics.items():
+                series = self._values[name]
+                family = name[:-len('_total')] if metric_type == 'counter' and name.endswith('_total') else name
+                lines.append(f'# TYPE {family} {metric_type}')
+                lines.append(f'# HELP {family} {help_text}')
+                for key, value in sorted(series.items()):
+                    if metric_type == 'counter':
+                        lines.append(f'{family}_total{self._format_labels(key)} {value}')
+                        continue
+                    for bound, count in zip(buckets, value['buckets']):
+                        le = '+Inf' if bound == float('inf') else repr(float(bound))
+                        lines.append(f'{name}_bucket{self._format_labels(key, [("le", le)])} {count}')
+                    lines.append(f'{name}_sum{self._format_labels(key)} {value["sum"]}')
+                    lines.append(f'{name}_count{self._format_labels(key)} {value["count"]}')
+        lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+
+class Instrumentation:
+    """
+    Collects metrics and structured events from the PowerBIDataSource, MSSQLDatabase and PowerAutomateScheduler clients.
+
+    Events are always written to the 'classDefinitions.instrumentation' logger. When enabled, metrics are recorded in
+    the registry and every event is passed to the registered hooks as hook(event_name, fields).
+    """
+
+    def __init__(self, registry=None, hooks=None, enabled=True):
+        """
+        Constructor for the Instrumentation class.
+
+        Parameters:
+            registry (MetricsRegistry, optional): The registry to record metrics in. A new one is created if omitted.
+            hooks (list of callable, optional): Callables invoked as hook(event_name, fields) for every event.
+            enabled (bool): Whether metrics and hooks are active (default is True).
+        """
+        self.registry = registry if registry is not None else MetricsRegistry()
+        self.hooks = list(hooks or [])
+        self.enabled = enabled
+
+    def add_hook(self, hook):
+        """
+        Registers a callable invoked as hook(event_name, fields) for every event.
+        """
+        self.hooks.append(hook)
+
+    def event(self, name, message=None, **fields):
+        """
+        Emits a structured event.
+
+        Parameters:
+            name (str): The event name, e.g. 'rows_deleted'.
+            message (str, optional): A human-readable message for the log record. Defaults to the event name.
+            **fields: Structured fields describing the event.
+        """
+        _get_logger().info(message or name, extra={'event': name, 'fields': fields})
+        if self.enabled:
+            for hook in self.hooks:
+                # A failing hook must never change the outcome of the operation that emitted the event
+                try:
+                    hook(name, fields)
+                except Exception:
+                    _get_logger().exception("Instrumentation hook %r failed for event %r.", hook, name)
+
+    def inc(self, name, value=1, **labels):
+        if self.enabled:
+            self.registry.inc(name, value, **labels)
+
+    def observe(self, name, value, **labels):
+        if self.enabled:
+            self.registry.observe(name, value, **labels)
+
+    def timer(self, name, **labels):
+        """
+        Returns a context manager that records the duration of its block in the named histogram.
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self.registry, name, labels)
+
+    def record_request(self, client, operation, response, elapsed):
+        """
+        Records the duration, status and body size of a completed HTTP request.
+
+        Parameters:
+            client (str): The client label, e.g. 'powerbi'.
+            operation (str): The operation label, e.g. 'append_rows'.
+            response (requests.Response): The response received.
+            elapsed (float): The duration of the request in seconds.
+        """
+        if not self.enabled:
+            return
+        self.registry.observe('powerbiapi_request_duration_seconds', elapsed, client=client, operation=operation)
+        self.registry.inc('powerbiapi_requests_total', client=client, operation=operation, status=str(response.status_code))
+        body = getattr(getattr(response, 'request', None), 'body', None)
+        if body:
+            self.registry.inc('powerbiapi_request_bytes_total', len(body), client=client, operation=operation)
+
+
+class _Timer:
+    __slots__ = ('registry', 'name', 'labels', 'start')
+
+    def __init__(self, registry, name, labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+_NULL_TIMER = nullcontext()
+
+# Shared disabled instance used by clients constructed without instrumentation.
+NULL_INSTRUMENTATION = Instrumentation(registry=MetricsRegistry(metrics={}), enabled=False)
+
+
+def instrumented(operation):
+    """
+    Decorator that records the duration of a client method in powerbiapi_operation_duration_seconds.
+
+    The decorated method's instance must have 'instrumentation' and '_metrics_client' attributes.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            instrumentation = self.instrumentation
+            if not instrumentation.enabled:
+                return method(self, *args, **kwargs)
+            with _Timer(instrumentation.registry, 'powerbiapi_operation_duration_seconds',
+                        {'client': self._metrics_client, 'operation': operation}):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,186 @@
+import unittest
+import requests
+from unittest.mock import patch
+from classDefinitions.dataSource import PowerBIDataSource
+
+
+def make_response(status_code, payload=None, text='', headers=None):
+    response = requests.models.Response()
+    response.status_code = status_code
+    response.json = lambda: payload
+    response._content = text.encode()
+    response.headers.update(headers or {})
+    return response
+
+
+class TestPowerBIDataSource(unittest.TestCase):
+    def setUp(self):
+        self.data_source = PowerBIDataSource('test_client_id', 'test_client_secret', 'test_tenant_id')
+        self.tables_response = make_response(200, {'value': [{'id': 'test_table_id', 'name': 'test_table_name'}]})
+        self.auth_response = make_response(200, {'access_token': 'test_access_token'})
+
+    @patch('requests.delete')
+    @patch('requests.get')
+    @patch('requests.post')
+    def test_delete_rows_by_keys_batches(self, mock_post, mock_get, mock_delete):
+        mock_post.return_value = self.auth_response
+        mock_get.return_value = self.tables_response
+        mock_delete.return_value = make_response(200)
+
+        outcomes = self.data_source.delete_rows_by_keys(
+            'test_dataset_id', 'test_table_name', 'id', [1, 2, 3, 2, 4, 5], batch_size=2
+        )
+
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(mock_delete.call_count, 3)
+        self.assertEqual([o['keys'] for o in outcomes], [[1, 2], [3, 4], [5]])
+        self.assertTrue(all(o['status'] == 'ok' for o in outcomes))
+        queries = sorted(c.kwargs['json']['deleteDetails'] for c in mock_delete.call_args_list)
+        self.assertEqual(queries, [
+            'delete from test_table_name where id in (1, 2)',
+            'delete from test_table_name where id in (3, 4)',
+            'delete from test_table_name where id in (5)',
+        ])
+
+    @patch('requests.delete')
+    @patch('requests.get')
+    @patch('requests.post')
+    def test_delete_rows_by_keys_confirm_policy(self, mock_post, mock_get, mock_delete):
+        mock_post.return_value = self.auth_response
+        mock_get.return_value = self.tables_response
+        mock_delete.return_value = make_response(400, text='bad request')
+
+        outcomes = self.data_source.delete_rows_by_keys(
+            'test_dataset_id', 'test_table_name', 'name', ["a'b", 'c'], batch_size=1,
+            confirm=lambda dataset_id, table_name, batch: batch['keys'] != ['c']
+        )
+
+        self.assertEqual(mock_delete.call_count, 1)
+        self.assertEqual(mock_delete.call_args.kwargs['json'], {'deleteDetails': "delete from test_table_name where name in ('a''b')"})
+        self.assertEqual([o['status'] for o in outcomes], ['failed', 'skipped'])
+        self.assertEqual(outcomes[0]['error'], 'bad request')
+
+    @patch('requests.patch')
+    @patch('requests.get')
+    @patch('requests.post')
+    def test_update_rows_by_keys_groups_identical_updates(self, mock_post, mock_get, mock_patch):
+        mock_post.return_value = self.auth_response
+        mock_get.return_value = self.tables_response
+        mock_patch.return_value = make_response(200)
+
+        outcomes = self.data_source.update_rows_by_keys(
+            'test_dataset_id', 'test_table_name', 'id',
+            {1: {'status': 'closed'}, 2: {'status': 'open'}, 3: {'status': 'closed'}}
+        )
+
+        self.assertEqual(mock_patch.call_count, 2)
+        self.assertEqual([o['keys'] for o in outcomes], [[1, 3], [2]])
+        queries = sorted(c.kwargs['json']['updateDetails'] for c in mock_patch.call_args_list)
+        self.assertEqual(queries, [
+            "update test_table_name set status = 'closed' where id in (1, 3)",
+            "update test_table_name set status = 'open' where id in (2)",
+        ])
+
+    @patch('builtins.input')
+    @patch('requests.patch')
+    @patch('requests.get')
+    @patch('requests.post')
+    def test_update_rows_confirm_skips_prompt(self, mock_post, mock_get, mock_patch, mock_input):
+        mock_post.return_value = self.auth_response
+        mock_get.return_value = self.tables_response
+        mock_patch.return_value = make_response(200)
+
+        self.data_source.update_rows('test_dataset_id', 'test_table_name', 'test_query', confirm=True)
+
+        mock_input.assert_not_called()
+        self.assertEqual(mock_patch.call_count, 1)
+
+    @patch('requests.patch')
+    @patch('requests.get')
+    @patch('requests.post')
+    def test_update_rows_by_keys_last_update_wins(self, mock_post, mock_get, mock_patch):
+        mock_post.return_value = self.auth_response
+        mock_get.return_value = self.tables_response
+        mock_patch.return_value = make_response(200)
+
+        outcomes = self.data_source.update_rows_by_keys(
+            'test_dataset_id', 'test_table_name', 'id', [(1, {'s': 'a'}), (2, {'s': 'a'}), (1, {'s': 'b'})]
+        )
+
+        self.assertEqual(mock_patch.call_count, 2)
+        self.assertEqual([o['keys'] for o in outcomes], [[1], [2]])
+        queries = sorted(c.kwargs['json']['updateDetails'] for c in mock_patch.call_args_list)
+        self.assertEqual(queries, [
+            "update test_table_name set s = 'a' where id in (2)",
+            "update test_table_name set s = 'b' where id in (1)",
+        ])
+
+    @patch('requests.delete')
+    @patch('requests.get')
+    @patch('requests.post')
+    def test_delete_rows_by_keys_sends_nothing_without_approved_batches(self, mock_post, mock_get, mock_delete):
+        self.assertEqual(self.data_source.delete_rows_by_keys('test_dataset_id', 'test_table_name', 'id', []), [])
+        outcomes = self.data_source.delete_rows_by_keys('test_dataset_id', 'test_table_name', 'id', [1, 2], confirm=False)
+
+        self.assertEqual([o['status'] for o in outcomes], ['skipped'])
+        mock_post.assert_not_called()
+        mock_get.assert_not_called()
+        mock_delete.assert_not_called()
+
+    @patch('requests.get')
+    @patch('requests.post')
+    def test_append_rows_in_batches(self, mock_post, mock_get):
+        mock_post.side_effect = [self.auth_response] + [make_response(200)] * 3
+        mock_get.return_value = self.tables_response
+        posted = []
+
+        self.data_source.append_rows('test_dataset_id', 'test_table_name', [{'a': i} for i in range(5)],
+                                     batch_size=2, on_batch=posted.append)
+
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual([c.kwargs['json']['rows'] for c in mock_post.call_args_list[1:]], posted)
+        self.assertEqual([len(batch) for batch in posted], [2, 2, 1])
+
+    @patch('requests.delete')
+    @patch('requests.get')
+    @patch('requests.post')
+    def test_bulk_methods_reject_interactive_confirm(self, mock_post, mock_get, mock_delete):
+        with self.assertRaises(ValueError):
+            self.data_source.delete_rows_by_keys('test_dataset_id', 'test_table_name', 'id', [1], confirm=None)
+        with self.assertRaises(ValueError):
+            self.data_source.update_rows_by_keys('test_dataset_id', 'test_table_name', 'id', {1: {'s': 'a'}}, confirm=None)
+
+        mock_post.assert_not_called()
+        mock_delete.assert_not_called()
+
+    @patch('requests.delete')
+    @patch('requests.get')
+    @patch('requests.post')
+    def test_delete_rows_by_keys_reports_batch_exceptions(self, mock_post, mock_get, mock_delete):
+        mock_post.return_value = self.auth_response
+        mock_get.return_value = self.tables_response
+        mock_delete.side_effect = [make_response(200), OSError('lock file unavailable')]
+
+        outcomes = self.data_source.delete_rows_by_keys(
+            'test_dataset_id', 'test_table_name', 'id', [1, 2], batch_size=1, max_workers=1
+        )
+
+        self.assertEqual([o['status'] for o in outcomes], ['ok', 'failed'])
+        self.assertEqual(outcomes[1]['error'], 'OSError: lock file unavailable')
+
+    @patch('requests.patch')
+    @patch('requests.get')
+    @patch('requests.post')
+    def test_update_rows_by_keys_ignores_column_order(self, mock_post, mock_get, mock_patch):
+        mock_post.return_value = self.auth_response
+        mock_get.return_value = self.tables_response
+        mock_patch.return_value = make_response(200)
+
+        outcomes = self.data_source.update_rows_by_keys(
+            'test_dataset_id', 'test_table_name', 'id', {1: {'a': 1, 'b': 2}, 2: {'b': 2, 'a': 1}}
+        )
+
+        self.assertEqual([o['keys'] for o in outcomes], [[1, 2]])
+        self.assertEqual(mock_patch.call_args.kwargs['json'],
+                         {'updateDetails': 'update test_table_name set a = 1, b = 2 where id in (1, 2)'})
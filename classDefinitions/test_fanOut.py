@@ -0,0 +1,123 @@
+import functools
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from benchmarks.fake_server import FakePowerBIServer
+from classDefinitions.fanOut import FanOutRunner, FileRateLimiter, FileTokenCache
+
+
+def make_rows(count):
+    return [{'id': i} for i in range(count)]
+
+
+class TestFileTokenCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, 'tokens.json')
+
+    def test_shared_between_instances(self):
+        FileTokenCache(self.path).set('key', 'test_access_token', 3600)
+        self.assertEqual(FileTokenCache(self.path).get('key'), 'test_access_token')
+        self.assertIsNone(FileTokenCache(self.path).get('other_key'))
+
+    def test_expiring_token_is_ignored(self):
+        cache = FileTokenCache(self.path)
+        cache.set('key', 'test_access_token', 60)
+        self.assertIsNone(cache.get('key'))
+
+
+class TestFileRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, 'rate_limits.json')
+
+    @patch('time.sleep')
+    def test_paces_requests_per_dataset(self, mock_sleep):
+        limiter = FileRateLimiter(self.path, max_requests_per_minute=60)
+        self.assertEqual(limiter.acquire('dataset_a'), 0.0)
+        self.assertEqual(limiter.acquire('dataset_b'), 0.0)
+        # A second limiter on the same file sees the slot already taken by the first
+        waited = FileRateLimiter(self.path, max_requests_per_minute=60).acquire('dataset_a')
+        self.assertAlmostEqual(waited, 1.0, delta=0.1)
+        mock_sleep.assert_called_once()
+
+    @patch('time.sleep')
+    def test_block_delays_next_acquire(self, mock_sleep):
+        limiter = FileRateLimiter(self.path, max_requests_per_minute=0)
+        limiter.block('dataset_a', 5)
+        self.assertAlmostEqual(limiter.acquire('dataset_a'), 5.0, delta=0.1)
+        self.assertEqual(limiter.acquire('dataset_b'), 0.0)
+
+
+class TestFanOutRunner(unittest.TestCase):
+    def setUp(self):
+        self.server = FakePowerBIServer(throttle_every=7, retry_after=0.01).start()
+        self.addCleanup(self.server.stop)
+
+    def test_run(self):
+        items = []
+        for i in range(4):
+            self.server.add_table(f'dataset_{i}', 'test_table_name')
+            items.append({'workspace_id': 'test_workspace', 'dataset_id': f'dataset_{i}', 'table_name': 'test_table_name',
+                          'rows': functools.partial(make_rows, 25)})
+        items.append({'dataset_id': 'missing_dataset', 'table_name': 'test_table_name', 'rows': make_rows(1)})
+        progress = []
+
+        runner = FanOutRunner(
+            'test_client_id', 'test_client_secret', 'test_tenant_id', processes=2, batch_size=10,
+            max_requests_per_minute=0, api_url=self.server.url, authority_url=self.server.url
+        )
+        report = runner.run(items, progress=lambda completed, total, result: progress.append((completed, total)))
+
+        self.assertEqual((report['items'], report['succeeded'], report['failed']), (5, 4, 1))
+        self.assertEqual(report['rows'], 100)
+        self.assertEqual([r['batches'] for r in report['results'][:4]], [3, 3, 3, 3])
+        self.assertEqual(report['failures'][0]['dataset_id'], 'missing_dataset')
+        self.assertIn('does not exist', report['failures'][0]['error'])
+        self.assertEqual(sorted(progress), [(i, 5) for i in range(1, 6)])
+        for i in range(4):
+            self.assertEqual(self.server.row_count(f'dataset_{i}', 'test_table_name'), 25)
+        self.assertGreater(self.server.throttled_count, 0)
+
+    def test_unpicklable_item_fails_alone(self):
+        self.server.throttle_every = 0
+        self.server.add_table('dataset_ok', 'test_table_name')
+        items = [
+            {'dataset_id': 'dataset_ok', 'table_name': 'test_table_name', 'rows': make_rows(1)},
+            {'dataset_id': 'dataset_ok', 'table_name': 'test_table_name', 'rows': lambda: make_rows(1)},
+        ]
+
+        runner = FanOutRunner(
+            'test_client_id', 'test_client_secret', 'test_tenant_id', processes=1,
+            max_requests_per_minute=0, api_url=self.server.url, authority_url=self.server.url
+        )
+        report = runner.run(items)
+
+        self.assertEqual([r['status'] for r in report['results']], ['ok', 'failed'])
+        self.assertEqual(report['failures'][0]['index'], 1)
+        self.assertEqual(self.server.row_count('dataset_ok', 'test_table_name'), 1)
+
+    def test_reserved_client_kwargs_are_rejected(self):
+        with self.assertRaisesRegex(ValueError, 'session'):
+            FanOutRunner('test_client_id', 'test_client_secret', 'test_tenant_id', session=object())
+
+    def test_item_authenticates_and_looks_up_table_once(self):
+        self.server.throttle_every = 0
+        self.server.add_table('dataset_ok', 'test_table_name')
+        items = [{'dataset_id': 'dataset_ok', 'table_name': 'test_table_name', 'rows': make_rows(50)}]
+
+        with tempfile.TemporaryDirectory() as state_dir:
+            runner = FanOutRunner(
+                'test_client_id', 'test_client_secret', 'test_tenant_id', processes=1, batch_size=10, state_dir=state_dir,
+                max_requests_per_minute=0, api_url=self.server.url, authority_url=self.server.url
+            )
+            report = runner.run(items)
+            mode = os.stat(os.path.join(state_dir, 'tokens.json')).st_mode & 0o777
+
+        self.assertEqual(report['results'][0]['batches'], 5)
+        # 1 token request, 1 table lookup and 5 row posts
+        self.assertEqual(self.server.request_count, 7)
+        self.assertEqual(mode, 0o600)
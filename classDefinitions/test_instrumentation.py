@@ -0,0 +1,210 @@
+import importlib.util
+import unittest
+from unittest.mock import patch
+from classDefinitions.dataSource import PowerBIDataSource
+from classDefinitions.instrumentation import Instrumentation, MetricsRegistry, NULL_INSTRUMENTATION
+from classDefinitions.PowerAutomate.powerAutoAPI import PowerAutomateScheduler
+from classDefinitions.SQLAlchemy.sqlAlchemy import MSSQLDatabase
+from classDefinitions.test_dataSource import make_response
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def test_render_counter_and_histogram(self):
+        registry = MetricsRegistry()
+        registry.inc('powerbiapi_requests_total', client='powerbi', operation='append_rows', status='200')
+        registry.inc('powerbiapi_requests_total', client='powerbi', operation='append_rows', status='200')
+        registry.observe('powerbiapi_rows_per_call', 50, client='powerbi', operation='append_rows')
+
+        text = registry.render()
+
+        self.assertIn('# TYPE powerbiapi_requests counter', text)
+        self.assertIn('powerbiapi_requests_total{client="powerbi",operation="append_rows",status="200"} 2', text)
+        self.assertIn('powerbiapi_rows_per_call_bucket{client="powerbi",operation="append_rows",le="10.0"} 0', text)
+        self.assertIn('powerbiapi_rows_per_call_bucket{client="powerbi",operation="append_rows",le="100.0"} 1', text)
+        self.assertIn('powerbiapi_rows_per_call_count{client="powerbi",operation="append_rows"} 1', text)
+        self.assertTrue(text.endswith('# EOF\n'))
+
+    def test_disabled_instrumentation_records_nothing(self):
+        hook_calls = []
+        NULL_INSTRUMENTATION.hooks.append(lambda name, fields: hook_calls.append(name))
+        try:
+            NULL_INSTRUMENTATION.event('rows_deleted')
+            with NULL_INSTRUMENTATION.timer('powerbiapi_operation_duration_seconds'):
+                pass
+        finally:
+            NULL_INSTRUMENTATION.hooks.clear()
+        self.assertEqual(hook_calls, [])
+
+
+class TestPowerBIDataSourceInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.events = []
+        self.instrumentation = Instrumentation(hooks=[lambda name, fields: self.events.append((name, fields))])
+        self.data_source = PowerBIDataSource(
+            'test_client_id', 'test_client_secret', 'test_tenant_id', instrumentation=self.instrumentation, max_retries=3
+        )
+
+    @patch('time.sleep')
+    @patch('requests.get')
+    @patch('requests.post')
+    def test_append_rows_records_metrics(self, mock_post, mock_get, mock_sleep):
+        mock_get.return_value = make_response(200, {'value': [{'id': 'test_table_id', 'name': 'test_table_name'}]})
+        mock_post.side_effect = [
+            make_response(200, {'access_token': 'test_access_token'}),
+            make_response(429, headers={'Retry-After': '2'}),
+            make_response(200),
+        ]
+
+        self.data_source.append_rows('test_dataset_id', 'test_table_name', [{'a': 1}, {'a': 2}])
+
+        registry = self.instrumentation.registry
+        mock_sleep.assert_called_once_with(2.0)
+        self.assertEqual(registry.get('powerbiapi_auth_refreshes_total', client='powerbi'), 1)
+        self.assertEqual(registry.get('powerbiapi_requests_total', client='powerbi', operation='append_rows', status='429'), 1)
+        self.assertEqual(registry.get('powerbiapi_requests_total', client='powerbi', operation='append_rows', status='200'), 1)
+        self.assertEqual(registry.get('powerbiapi_rate_limit_wait_seconds_total', client='powerbi', operation='append_rows'), 2.0)
+        self.assertEqual(registry.get('powerbiapi_rows_per_call', client='powerbi', operation='append_rows')['sum'], 2)
+        self.assertEqual(registry.get('powerbiapi_operation_duration_seconds', client='powerbi', operation='append_rows')['count'], 1)
+        self.assertEqual([name for name, _ in self.events], ['rate_limited'])
+
+    @patch('time.sleep')
+    @patch('requests.get')
+    @patch('requests.post')
+    def test_retry_after_above_cap_is_not_waited(self, mock_post, mock_get, mock_sleep):
+        mock_get.return_value = make_response(200, {'value': [{'id': 'test_table_id', 'name': 'test_table_name'}]})
+        mock_post.side_effect = [
+            make_response(200, {'access_token': 'test_access_token'}),
+            make_response(429, headers={'Retry-After': '3600'}),
+        ]
+
+        with self.assertRaises(ValueError):
+            self.data_source.append_rows('test_dataset_id', 'test_table_name', [{'a': 1}])
+
+        mock_sleep.assert_not_called()
+        self.assertEqual(mock_post.call_count, 2)
+
+    @patch('requests.delete')
+    @patch('requests.get')
+    @patch('requests.post')
+    def test_failing_hook_does_not_fail_operation(self, mock_post, mock_get, mock_delete):
+        mock_post.return_value = make_response(200, {'access_token': 'test_access_token'})
+        mock_get.return_value = make_response(200, {'value': [{'id': 'test_table_id', 'name': 'test_table_name'}]})
+        mock_delete.return_value = make_response(200)
+
+        def broken_hook(name, fields):
+            raise RuntimeError('broken hook')
+        self.instrumentation.add_hook(broken_hook)
+
+        with self.assertLogs('classDefinitions.instrumentation', level='ERROR'):
+            self.data_source.delete_rows('test_dataset_id', 'test_table_name', 'test_query')
+        self.assertEqual([name for name, _ in self.events], ['rows_deleted'])
+
+    @patch('requests.get')
+    @patch('requests.post')
+    def test_rate_limiter_waits_are_recorded_apart_from_429_waits(self, mock_post, mock_get):
+        class RateLimiter:
+            def __init__(self):
+                self.blocked = []
+
+            def acquire(self, dataset_id):
+                return 0.5
+
+            def block(self, dataset_id, seconds):
+                self.blocked.append(seconds)
+
+        rate_limiter = RateLimiter()
+        data_source = PowerBIDataSource('test_client_id', 'test_client_secret', 'test_tenant_id', max_retries=1,
+                                         instrumentation=self.instrumentation, rate_limiter=rate_limiter)
+        mock_get.return_value = make_response(200, {'value': [{'id': 'test_table_id', 'name': 'test_table_name'}]})
+        mock_post.side_effect = [
+            make_response(200, {'access_token': 'test_access_token'}),
+            make_response(429, headers={'Retry-After': '2'}),
+            make_response(200),
+        ]
+
+        data_source.append_rows('test_dataset_id', 'test_table_name', [{'a': 1}])
+
+        registry = self.instrumentation.registry
+        self.assertEqual(rate_limiter.blocked, [2.0])
+        self.assertEqual(registry.get('powerbiapi_rate_limit_wait_seconds_total', client='powerbi', operation='append_rows'), 2.0)
+        self.assertEqual(registry.get('powerbiapi_rate_limiter_wait_seconds_total', client='powerbi', operation='append_rows'), 1.0)
+
+    @patch('time.sleep')
+    @patch('requests.get')
+    @patch('requests.post')
+    def test_rate_limited_request_is_not_retried_by_default(self, mock_post, mock_get, mock_sleep):
+        data_source = PowerBIDataSource('test_client_id', 'test_client_secret', 'test_tenant_id')
+        mock_get.return_value = make_response(200, {'value': [{'id': 'test_table_id', 'name': 'test_table_name'}]})
+        mock_post.side_effect = [
+            make_response(200, {'access_token': 'test_access_token'}),
+            make_response(429, headers={'Retry-After': '2'}),
+        ]
+
+        with self.assertRaises(ValueError):
+            data_source.append_rows('test_dataset_id', 'test_table_name', [{'a': 1}])
+
+        mock_sleep.assert_not_called()
+        self.assertEqual(mock_post.call_count, 2)
+
+
+@unittest.skipUnless(importlib.util.find_spec('sqlalchemy'), 'SQLAlchemy is not installed')
+class TestMSSQLDatabaseInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.events = []
+        self.instrumentation = Instrumentation(hooks=[lambda name, fields: self.events.append(name)])
+        self.database = MSSQLDatabase('sqlite://', 'test_database', 'main', 'test_table', instrumentation=self.instrumentation)
+        self.database.create_table([{'name': 'id', 'type': 'Integer'}, {'name': 'name', 'type': 'String'}])
+
+    def test_append_and_select_record_metrics(self):
+        self.database.append_table([{'id': 1, 'name': 'a'}, {'id': 2, 'name': 'b'}, {'id': 3, 'name': 'c'}])
+        rows = self.database.select_table(['id', 'name'])
+
+        registry = self.instrumentation.registry
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(registry.get('powerbiapi_reflection_duration_seconds', client='mssql')['count'], 2)
+        self.assertEqual(registry.get('powerbiapi_rows_per_call', client='mssql', operation='append_table')['sum'], 3)
+        self.assertEqual(registry.get('powerbiapi_rows_per_call', client='mssql', operation='select_table')['sum'], 3)
+        for operation in ['create_table', 'append_table', 'select_table']:
+            self.assertEqual(registry.get('powerbiapi_operation_duration_seconds', client='mssql', operation=operation)['count'], 1)
+        self.assertEqual(self.events, ['table_created', 'rows_appended'])
+
+    def test_update_and_delete_emit_events(self):
+        self.database.update_table('update main.test_table set name = null')
+        self.database.delete_table('delete from main.test_table')
+
+        self.assertEqual(self.events, ['table_created', 'table_updated', 'table_deleted'])
+
+
+class TestPowerAutomateSchedulerInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.instrumentation = Instrumentation()
+        self.scheduler = PowerAutomateScheduler(
+            'test_client_id', 'test_client_secret', 'test_tenant_id', 'test_subscription_id',
+            'test_resource_group', 'test_factory_name', instrumentation=self.instrumentation
+        )
+
+    @patch('requests.put')
+    @patch('requests.post')
+    def test_schedule_records_metrics(self, mock_post, mock_put):
+        mock_post.return_value = make_response(200, {'access_token': 'test_access_token'})
+        mock_put.return_value = make_response(201)
+
+        self.scheduler.schedule(dataset_id='test_dataset_id', table_name='test_table_name', schedule_name='test_schedule_name')
+
+        registry = self.instrumentation.registry
+        self.assertEqual(registry.get('powerbiapi_auth_refreshes_total', client='powerautomate'), 1)
+        self.assertEqual(registry.get('powerbiapi_requests_total', client='powerautomate', operation='connect', status='200'), 1)
+        self.assertEqual(registry.get('powerbiapi_requests_total', client='powerautomate', operation='schedule', status='201'), 1)
+        self.assertEqual(registry.get('powerbiapi_request_duration_seconds', client='powerautomate', operation='schedule')['count'], 1)
+        self.assertEqual(registry.get('powerbiapi_operation_duration_seconds', client='powerautomate', operation='schedule')['count'], 1)
+
+    @patch('requests.post')
+    def test_failed_auth_is_not_counted_as_refresh(self, mock_post):
+        mock_post.return_value = make_response(401, text='unauthorized')
+
+        with self.assertRaises(ValueError):
+            self.scheduler.connect()
+
+        registry = self.instrumentation.registry
+        self.assertIsNone(registry.get('powerbiapi_auth_refreshes_total', client='powerautomate'))
+        self.assertEqual(registry.get('powerbiapi_requests_total', client='powerautomate', operation='connect', status='401'), 1)
@@ -0,0 +1,33 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def loaded_modules(statement):
+    code = f"import json, sys\n{statement}\nprint(json.dumps(sorted(sys.modules)))"
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True, cwd=ROOT).stdout
+    return set(json.loads(out))
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_package_import_loads_no_clients(self):
+        modules = loaded_modules('import classDefinitions')
+        self.assertNotIn('classDefinitions.dataSource', modules)
+        self.assertNotIn('requests', modules)
+        self.assertNotIn('sqlalchemy', modules)
+
+    def test_client_imports_defer_dependencies(self):
+        for name in ('PowerBIDataSource', 'MSSQLDatabase', 'PowerAutomateScheduler', 'FanOutRunner'):
+            modules = loaded_modules(f'from classDefinitions import {name}')
+            self.assertNotIn('requests', modules, name)
+            self.assertNotIn('sqlalchemy', modules, name)
+
+    def test_unknown_attribute(self):
+        import classDefinitions
+        with self.assertRaises(AttributeError):
+            classDefinitions.NotAClient
+        self.assertIn('PowerBIDataSource', dir(classDefinitions))